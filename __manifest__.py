@@ -11,6 +11,7 @@
         'security/user_groups.xml',
         'security/ir.model.access.csv',
         'security/ir_rule.xml',
+        'data/ir_cron.xml',
         # 'wizard/preacher_password_wizard.xml',
         # --- Load views ---
         'views/menu.xml', # Muat menu utama dulu
@@ -21,6 +22,7 @@
          'views/specialization_views.xml',   
         'views/schedule_views.xml',
         'views/content_views.xml',
+        'wizard/import_wizard.xml',
         
     ],
     'installable': True,
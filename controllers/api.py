@@ -1,198 +1,698 @@
 # -*- coding: utf-8 -*-
-from odoo import http, fields # <-- 'fields' ditambahkan
+from odoo import api, http, fields # <-- 'fields' ditambahkan
+from odoo.exceptions import UserError, ValidationError
 from odoo.http import request, Response
+from odoo.osv import expression
+from odoo.tools import SQL
+import base64
+import hashlib
 import json
 import logging 
-from datetime import datetime # <-- 'datetime' ditambahkan
+from datetime import datetime, timedelta # <-- 'datetime' ditambahkan
+
+from ..models.image_variants import IMAGE_VARIANT_SIZES
+from ..models.schedule import SCHEDULE_BLOCKING_STATES
+from ..models.search import normalize_search_text
+from ..models.sync import SYNC_TOMBSTONE_RETENTION_DAYS
 
 # Mengatur logger untuk debugging
 _logger = logging.getLogger(__name__) 
 
+# Batas ukuran halaman untuk endpoint list (limit dari klien dibatasi di server)
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+# Data /api/v1/sync: kunci respon -> (model, field yang dikirim, domain record yang tampil di aplikasi)
+SYNC_MODELS = {
+    'areas': ('area.area', ['name', 'parent_id', 'latitude', 'longitude'], []),
+    'specializations': ('preacher.specialization', ['name'], []),
+    'mosques': ('mosque.mosque', ['name', 'code', 'area_id', 'full_address', 'latitude', 'longitude',
+                                  'image_checksum', 'image_variants_checksum', 'upcoming_sermon_count',
+                                  'next_sermon_at', 'sermons_delivered_count'], []),
+    'preachers': ('preacher.preacher', ['name', 'code', 'specialization_id', 'area_id',
+                                        'image_checksum', 'image_variants_checksum', 'upcoming_sermon_count',
+                                        'next_sermon_at', 'sermons_delivered_count'], []),
+    'schedules': ('sermon.schedule', ['topic', 'start_time', 'end_time', 'mosque_id', 'preacher_id'],
+                  [('state', '=', 'confirmed')]),
+}
+# Token sync dimundurkan sekian detik: write_date adalah waktu mulai transaksi, jadi
+# transaksi panjang yang commit setelah sync tetap terambil pada sync berikutnya.
+SYNC_OVERLAP_SECONDS = 300
+
+# Jumlah record yang dibaca & diserialisasi per chunk pada respon streaming
+STREAM_CHUNK_SIZE = 200
+
+# Field output /api/v1/mosques -> field model yang perlu dibaca
+MOSQUE_LIST_FIELDS = {
+    'id': [],
+    'name': ['name'],
+    'code': ['code'],
+    'area': ['area_id'],
+    'image_url': ['image_checksum'],
+    'image_srcset': ['image_checksum', 'image_variants_checksum'],
+    'upcoming_sermon_count': ['upcoming_sermon_count'],
+    'next_sermon_at': ['next_sermon_at'],
+    'sermons_delivered_count': ['sermons_delivered_count'],
+}
+
+# Urutan yang didukung /api/v1/preachers?sort=
+PREACHER_SORTS = {
+    'name': 'name ASC, id ASC',
+    'upcoming': 'upcoming_sermon_count DESC, id ASC',
+    'next_sermon': 'next_sermon_at ASC NULLS LAST, id ASC',
+    'delivered': 'sermons_delivered_count DESC, id ASC',
+}
+
+# Tipe hasil /api/v1/search -> model yang memakai masjida.search.mixin
+SEARCH_TYPES = {
+    'mosque': 'mosque.mosque',
+    'preacher': 'preacher.preacher',
+    'schedule': 'sermon.schedule',
+}
+MAX_SEARCH_LIMIT = 50
+
+# Aksi /api/v1/schedules/batch -> method sermon.schedule (bekerja pada recordset)
+BATCH_SCHEDULE_ACTIONS = {
+    'confirm': 'action_confirm',
+    'reject': 'action_reject',
+}
+
+# Cache HTTP (detik) untuk respon publik read-only, dipakai bersama ETag/Last-Modified
+PUBLIC_CACHE_MAX_AGE = 60
+REFERENCE_CACHE_MAX_AGE = 300
+
+# Radius (km) untuk /api/v1/mosques/nearby
+DEFAULT_NEARBY_RADIUS_KM = 5.0
+MAX_NEARBY_RADIUS_KM = 50.0
+
+# Rentang maksimal (hari) dan durasi default (menit) untuk /api/v1/preachers/<id>/free_slots
+MAX_FREE_SLOT_DAYS = 31
+DEFAULT_FREE_SLOT_MINUTES = 60
+
+
+def _image_url(model_name, record_id, field_name, checksum):
+    """
+    Membuat URL gambar publik dari checksum yang tersimpan (tanpa membaca binary).
+    Checksum dikirim sebagai '?unique=' sehingga klien boleh men-cache URL selamanya;
+    URL berubah otomatis ketika gambar diganti.
+    """
+    if not checksum:
+        return None
+    # Mengembalikan URL relatif. Klien (Flutter) akan menambahkan _baseUrl
+    return f'/web/image/{model_name}/{record_id}/{field_name}?unique={checksum}'
+
+
+def _image_srcset(model_name, record_id, field_name, checksum, variants_checksum):
+    """
+    Peta URL gambar per ukuran ('128', '256', '512', 'full') untuk klien mobile.
+    Turunan dibuat oleh cron (masjida.image.variant.mixin); selama belum siap
+    (checksum turunan berbeda), semua ukuran menunjuk ke gambar penuh.
+    """
+    full_url = _image_url(model_name, record_id, field_name, checksum)
+    if not full_url:
+        return None
+    srcset = {'full': full_url}
+    for size in IMAGE_VARIANT_SIZES:
+        if variants_checksum == checksum:
+            srcset[str(size)] = _image_url(model_name, record_id, f'image_{size}', checksum)
+        else:
+            srcset[str(size)] = full_url
+    return srcset
+
+
+def _encode_cursor(values):
+    """Membuat cursor (opaque string) dari nilai kunci baris terakhir sebuah halaman."""
+    raw = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """Kebalikan dari _encode_cursor. Raise ValueError jika cursor tidak valid."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def _parse_limit(limit, default=DEFAULT_PAGE_LIMIT, maximum=MAX_PAGE_LIMIT):
+    """Mengubah parameter 'limit' menjadi integer di antara 1 dan maximum."""
+    try:
+        limit = int(limit)
+    except (ValueError, TypeError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def _parse_projection(requested, allowed):
+    """
+    Mengubah parameter 'fields' (dipisah koma) menjadi list field output.
+    Field yang tidak dikenal diabaikan; jika kosong, semua field dikembalikan.
+    """
+    if not requested:
+        return list(allowed)
+    names = [name.strip() for name in requested.split(',')]
+    return [name for name in allowed if name in names] or list(allowed)
+
+
+def _data_fingerprint(model_names):
+    """
+    Menghitung (etag, last_modified) dari max(write_date) dan jumlah record setiap model.
+    Hanya satu query agregat per model, jauh lebih murah dari membangun respon penuh.
+    """
+    parts = []
+    last_modified = None
+    for model_name in model_names:
+        table = request.env[model_name]._table
+        request.env.cr.execute(SQL("SELECT max(write_date), count(*) FROM %s", SQL.identifier(table)))
+        max_write_date, count = request.env.cr.fetchone()
+        parts.append(f'{model_name}:{max_write_date}:{count}')
+        if max_write_date and (last_modified is None or max_write_date > last_modified):
+            last_modified = max_write_date
+    etag = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+    return etag, last_modified
+
+
+def _not_modified(etag, last_modified):
+    """True jika header If-None-Match / If-Modified-Since klien masih valid."""
+    httprequest = request.httprequest
+    if httprequest.if_none_match:
+        return httprequest.if_none_match.contains(etag)
+    if httprequest.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= httprequest.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def _set_cache_headers(response, etag, last_modified, max_age=PUBLIC_CACHE_MAX_AGE):
+    """Menambahkan ETag, Last-Modified dan Cache-Control publik ke respon."""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
+
+def _not_modified_response(etag, last_modified, max_age=PUBLIC_CACHE_MAX_AGE):
+    """Respon 304 tanpa body untuk klien/proxy yang masih menyimpan versi terbaru."""
+    return _set_cache_headers(Response(status=304), etag, last_modified, max_age)
+
 
-def _get_image_url(record, field_name):
-    """Fungsi helper untuk membuat URL gambar publik dari Odoo."""
-    if record[field_name]:
-        # Mengembalikan URL relatif. Klien (Flutter) akan menambahkan _baseUrl
-        return f'/web/image/{record._name}/{record.id}/{field_name}'
-    return None
+def _stream_json_response(model, ids, field_names, serialize, extra=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Respon JSON streaming (chunked transfer encoding) untuk endpoint list.
+    Record 'ids' dibaca per chunk_size dan langsung ditulis ke klien, lalu cache ORM
+    dikosongkan, sehingga memori worker tetap kecil berapapun jumlah datanya.
+    Generator berjalan setelah cursor request ditutup, jadi memakai cursor sendiri
+    dengan uid/context/sudo yang sama. 'status' dan 'count' ditulis di akhir objek;
+    jika terjadi error di tengah stream, 'status' menjadi 'error'.
+    """
+    registry = model.env.registry
+    uid, context, su = model.env.uid, dict(model.env.context), model.env.su
+    model_name = model._name
+
+    def generate():
+        count = 0
+        yield b'{"data": ['
+        try:
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context, su=su)
+                for start in range(0, len(ids), chunk_size):
+                    records = env[model_name].browse(ids[start:start + chunk_size]).exists()
+                    chunk = [json.dumps(serialize(row), default=str) for row in records.read(field_names)]
+                    if chunk:
+                        yield ((', ' if count else '') + ', '.join(chunk)).encode()
+                        count += len(chunk)
+                    env.invalidate_all()
+            tail = {'status': 'success', 'count': count, **(extra or {})}
+        except Exception as e:
+            _logger.error(f"Error saat streaming {model_name}: {e}", exc_info=True)
+            tail = {'status': 'error', 'count': count, 'message': str(e)}
+        yield ('], ' + json.dumps(tail)[1:]).encode()
+
+    return Response(generate(), content_type='application/json', status=200, direct_passthrough=True)
+
+
+def _parse_include(include, allowed, default=('schedules',)):
+    """
+    Parameter 'include' (dipisah koma) untuk ekspansi relasi di endpoint detail.
+    Tanpa parameter -> default; 'include=' kosong -> tidak ada ekspansi.
+    """
+    if include is None:
+        return set(default)
+    return {name.strip() for name in include.split(',')} & set(allowed)
+
+
+def _read_schedules(domain, partner_field):
+    """
+    Jadwal untuk endpoint detail dalam satu search_read (nama relasi ikut terbaca).
+    partner_field: 'mosque_id' atau 'preacher_id', relasi yang ditampilkan.
+    Dibaca dengan sudo() agar hasil tidak bergantung pada ir.rule pemanggil (respon
+    detail di-cache publik); domain harus memuat filter visibilitas secara eksplisit.
+    """
+    prefix = partner_field.split('_')[0]
+    schedules = request.env['sermon.schedule'].sudo().search_read(domain, ['id', 'topic', 'start_time', partner_field])
+    return [{
+        'id': s['id'],
+        'topic': s['topic'],
+        'start_time': s['start_time'].isoformat() if s.get('start_time') else None,
+        f'{prefix}_id': s[partner_field][0],
+        f'{prefix}_name': s[partner_field][1],
+    } for s in schedules]
+
+
+def _read_contents(domain, limit=20):
+    """
+    Konten (sermon.content) untuk endpoint detail dalam satu search_read.
+    Seperti _read_schedules: dibaca dengan sudo(), domain harus eksplisit.
+    """
+    contents = request.env['sermon.content'].sudo().search_read(
+        domain, ['id', 'name', 'content_type', 'video_url', 'publish_date', 'state',
+                 'image_checksum', 'image_variants_checksum'],
+        order='publish_date DESC, id DESC', limit=limit,
+    )
+    return [{
+        'id': c['id'],
+        'name': c['name'],
+        'content_type': c['content_type'],
+        'video_url': c['video_url'] or None,
+        'image_url': _image_url('sermon.content', c['id'], 'image_content', c['image_checksum']),
+        'image_srcset': _image_srcset('sermon.content', c['id'], 'image_content',
+                                      c['image_checksum'], c['image_variants_checksum']),
+        'publish_date': c['publish_date'].isoformat() if c.get('publish_date') else None,
+        'state': c['state'],
+    } for c in contents]
+
+
+def _sync_value(value):
+    """Nilai field untuk /api/v1/sync: Many2one -> id, datetime -> ISO, kosong -> None."""
+    if isinstance(value, tuple):
+        return value[0]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is False:
+        return None
+    return value
+
+
+def _area_operator(include_children):
+    """Operator domain untuk filter area_id: 'child_of' jika include_children diaktifkan."""
+    if include_children and str(include_children).lower() in ('1', 'true', 'yes'):
+        return 'child_of'
+    return '='
+
+
+def _parse_time_of_day(value):
+    """Mengubah 'HH:MM' menjadi menit sejak tengah malam. None jika kosong/tidak valid."""
+    if not value:
+        return None
+    try:
+        hour, minute = (int(part) for part in value.split(':'))
+    except (ValueError, TypeError):
+        _logger.warning(f"Invalid time of day passed: {value}")
+        return None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return hour * 60 + minute
 
 class SermonAPIController(http.Controller):
      
     @http.route('/api/v1/mosques', auth='public', methods=['GET'], type='http', cors='*')
-    def get_mosques(self, search=None, area_id=None, **kwargs):
+    def get_mosques(self, search=None, area_id=None, include_children=None, limit=None, cursor=None, **kwargs):
         """
-        Endpoint untuk mendapatkan daftar semua masjid.
+        Endpoint untuk mendapatkan daftar masjid (per halaman).
         Mendukung pencarian berdasarkan 'name' dan 'area_id.name'.
-        Mendukung filter berdasarkan 'area_id'.
+        Mendukung filter berdasarkan 'area_id'; include_children=1 ikut menyertakan
+        seluruh sub-area (child_of pada parent_path ter-index).
+        Paginasi keyset pada (name, id): kirim 'next_cursor' dari respon sebelumnya
+        sebagai 'cursor' untuk halaman berikutnya. 'limit' dibatasi MAX_PAGE_LIMIT.
+        'fields' (dipisah koma) membatasi field yang dikirim, misal fields=id,name.
+        Mendukung ETag/If-None-Match: 304 dikirim tanpa menjalankan query daftar.
         """
         try:
+            etag, last_modified = _data_fingerprint(['mosque.mosque', 'area.area'])
+            if _not_modified(etag, last_modified):
+                return _not_modified_response(etag, last_modified)
+
             # Domain adalah list untuk filter Odoo
             domain = []
             
             # 1. Logika Pencarian (Search)
             if search:
                 # 'ilike' artinya case-insensitive search (tidak peduli huruf besar/kecil)
-                # Domain OR: Cari berdasarkan nama masjid ATAU nama area
-                domain += [
-                    '|',
-                    ('name', 'ilike', search),
-                    ('area_id.name', 'ilike', search) 
-                ]
+                # search_text berisi nama masjid + nama area (index trigram, tanpa join)
+                domain.append(('search_text', 'ilike', normalize_search_text(search)))
 
             # 2. Logika Filter (Area)
             if area_id:
                 try:
                     # Pastikan area_id adalah angka (integer)
                     area_id_int = int(area_id)
-                    domain.append(('area_id', '=', area_id_int))
+                    domain.append(('area_id', _area_operator(include_children), area_id_int))
                 except ValueError:
                     _logger.warning(f"Nilai area_id tidak valid diterima: {area_id}")
                     pass # Abaikan jika area_id tidak valid (misal: "null" atau string kosong)
 
-            # Terapkan domain (filter) ke pencarian
-            mosques_raw = request.env['mosque.mosque'].search_read(
+            # 3. Paginasi Keyset: lanjutkan setelah (name, id) baris terakhir halaman sebelumnya.
+            # Biaya halaman ke-N sama dengan halaman pertama (tanpa OFFSET).
+            if cursor:
+                try:
+                    last_name, last_id = _decode_cursor(cursor)
+                    last_id = int(last_id)
+                except (ValueError, TypeError):
+                    error_response = {'status': 'error', 'message': 'Invalid cursor.'}
+                    return Response(json.dumps(error_response), content_type='application/json', status=400)
+                # Konjungsi name >= last_name memberi batas bawah pada index (name, id);
+                # tanpa itu Postgres memindai ulang semua baris halaman sebelumnya.
+                domain += [
+                    ('name', '>=', last_name),
+                    '|', ('name', '>', last_name), ('id', '>', last_id),
+                ]
+
+            page_limit = _parse_limit(limit)
+            output_fields = _parse_projection(kwargs.get('fields'), MOSQUE_LIST_FIELDS)
+            read_fields = ['id', 'name']
+            for output_field in output_fields:
+                read_fields += [f for f in MOSQUE_LIST_FIELDS[output_field] if f not in read_fields]
+
+            # Terapkan domain (filter) ke pencarian. Ambil 1 baris ekstra untuk
+            # mengetahui apakah masih ada halaman berikutnya.
+            # .sudo(): daftar masjid publik sama untuk semua pemanggil (ir.rule admin masjid
+            # tidak boleh memfilter respon yang di-cache publik dengan satu ETag global)
+            Mosque = request.env['mosque.mosque'].sudo()
+            mosque_ids = Mosque.search(
                 domain,
-                ['id', 'name', 'code', 'area_id', 'image'],
-                order='name ASC' # Urutkan berdasarkan nama
-            )
-            
+                order='name ASC, id ASC', # Urutkan berdasarkan nama (id sebagai pemutus)
+                limit=page_limit + 1,
+            ).ids
+            has_more = len(mosque_ids) > page_limit
+            mosque_ids = mosque_ids[:page_limit]
+
+            next_cursor = None
+            if has_more:
+                last = Mosque.browse(mosque_ids[-1])
+                next_cursor = _encode_cursor([last.name, last.id])
+
+            def serialize(m):
+                row = {
+                    'id': m['id'],
+                    'name': m.get('name'),
+                    'code': m.get('code'),
+                    'area': m['area_id'][1] if m.get('area_id') else 'N/A', # Mengambil nama area
+                    'image_url': _image_url('mosque.mosque', m['id'], 'image', m.get('image_checksum')),
+                    'image_srcset': _image_srcset('mosque.mosque', m['id'], 'image',
+                                                  m.get('image_checksum'), m.get('image_variants_checksum')),
+                    'upcoming_sermon_count': m.get('upcoming_sermon_count'),
+                    'next_sermon_at': m['next_sermon_at'].isoformat() if m.get('next_sermon_at') else None,
+                    'sermons_delivered_count': m.get('sermons_delivered_count'),
+                }
+                return {key: row[key] for key in output_fields}
+
+            response = _stream_json_response(Mosque, mosque_ids, read_fields, serialize,
+                                             extra={'next_cursor': next_cursor})
+            return _set_cache_headers(response, etag, last_modified)
+        
+        except Exception as e:
+            _logger.error(f"Error saat get_mosques: {e}", exc_info=True)
+            error_response = {'status': 'error', 'message': str(e)}
+            return Response(json.dumps(error_response), content_type='application/json', status=500)
+
+    @http.route('/api/v1/mosques/nearby', auth='public', methods=['GET'], type='http', cors='*')
+    def get_nearby_mosques(self, lat=None, lon=None, radius=None, limit=None, **kwargs):
+        """
+        Endpoint "masjid terdekat": daftar masjid dalam radius (km) dari (lat, lon),
+        diurutkan dari yang paling dekat. radius dibatasi MAX_NEARBY_RADIUS_KM.
+        """
+        try:
+            try:
+                latitude, longitude = float(lat), float(lon)
+            except (ValueError, TypeError):
+                error_response = {'status': 'error', 'message': 'Parameter lat dan lon wajib berupa angka.'}
+                return Response(json.dumps(error_response), content_type='application/json', status=400)
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                error_response = {'status': 'error', 'message': 'Koordinat di luar jangkauan.'}
+                return Response(json.dumps(error_response), content_type='application/json', status=400)
+
+            try:
+                radius_km = float(radius) if radius else DEFAULT_NEARBY_RADIUS_KM
+            except (ValueError, TypeError):
+                radius_km = DEFAULT_NEARBY_RADIUS_KM
+            radius_km = max(0.1, min(radius_km, MAX_NEARBY_RADIUS_KM))
+
+            Mosque = request.env['mosque.mosque']
+            nearby = Mosque._search_nearby(latitude, longitude, radius_km, limit=_parse_limit(limit))
+            distances = dict(nearby)
+            rows = {m['id']: m for m in Mosque.browse(distances).read(
+                ['name', 'code', 'area_id', 'image_checksum', 'image_variants_checksum', 'latitude', 'longitude'])}
+
             mosques_data = [{
-                'id': m['id'],
-                'name': m['name'],
-                'code': m['code'],
-                'area': m['area_id'][1] if m.get('area_id') else 'N/A', # Mengambil nama area
-                'image_url': f'/web/image/mosque.mosque/{m["id"]}/image' if m.get('image') else None
-            } for m in mosques_raw]
+                'id': mosque_id,
+                'name': rows[mosque_id]['name'],
+                'code': rows[mosque_id]['code'],
+                'area': rows[mosque_id]['area_id'][1] if rows[mosque_id].get('area_id') else 'N/A',
+                'image_url': _image_url('mosque.mosque', mosque_id, 'image', rows[mosque_id].get('image_checksum')),
+                'image_srcset': _image_srcset('mosque.mosque', mosque_id, 'image', rows[mosque_id].get('image_checksum'),
+                                              rows[mosque_id].get('image_variants_checksum')),
+                'latitude': rows[mosque_id]['latitude'],
+                'longitude': rows[mosque_id]['longitude'],
+                'distance_km': distance,
+            } for mosque_id, distance in nearby]
 
             response_data = {
                 'status': 'success',
                 'count': len(mosques_data),
-                'data': mosques_data
+                'radius_km': radius_km,
+                'data': mosques_data,
             }
             return Response(json.dumps(response_data), content_type='application/json', status=200)
-        
         except Exception as e:
-            _logger.error(f"Error saat get_mosques: {e}", exc_info=True)
+            _logger.error(f"Error saat get_nearby_mosques: {e}", exc_info=True)
             error_response = {'status': 'error', 'message': str(e)}
             return Response(json.dumps(error_response), content_type='application/json', status=500)
 
     @http.route('/api/v1/preachers', auth='public', methods=['GET'], type='http', cors='*')
-    def get_preachers(self, **kwargs):
-        """Endpoint untuk mendapatkan daftar semua pendakwah."""
+    def get_preachers(self, sort=None, **kwargs):
+        """
+        Endpoint untuk mendapatkan daftar semua pendakwah.
+        sort: name, upcoming, next_sermon, delivered (memakai agregat jadwal tersimpan).
+        """
         try:
-            preachers_raw = request.env['preacher.preacher'].search_read(
-                [],
-                ['id', 'name', 'code', 'specialization_id', 'area_id', 'image']
-            )
-            preachers_data = [{
-                'id': p['id'],
-                'name': p['name'],
-                'code': p['code'],
-                # Mengirim NAMA untuk tampilan
-                'specialization': p['specialization_id'][1] if p.get('specialization_id') else 'N/A',
-                'area': p['area_id'][1] if p.get('area_id') else 'N/A',
-                # BARU: Mengirim ID untuk filtering
-                'specialization_id': p['specialization_id'][0] if p.get('specialization_id') else None,
-                'area_id': p['area_id'][0] if p.get('area_id') else None,
-                'image_url': f'/web/image/preacher.preacher/{p["id"]}/image' if p.get('image') else None
-            } for p in preachers_raw]
+            Preacher = request.env['preacher.preacher']
+            preacher_ids = Preacher.search([], order=PREACHER_SORTS.get(sort)).ids
 
-            response_data = {
-                'status': 'success',
-                'count': len(preachers_data),
-                'data': preachers_data
-            }
-            return Response(json.dumps(response_data), content_type='application/json', status=200)
+            def serialize(p):
+                return {
+                    'id': p['id'],
+                    'name': p['name'],
+                    'code': p['code'],
+                    # Mengirim NAMA untuk tampilan
+                    'specialization': p['specialization_id'][1] if p.get('specialization_id') else 'N/A',
+                    'area': p['area_id'][1] if p.get('area_id') else 'N/A',
+                    # BARU: Mengirim ID untuk filtering
+                    'specialization_id': p['specialization_id'][0] if p.get('specialization_id') else None,
+                    'area_id': p['area_id'][0] if p.get('area_id') else None,
+                    # Hanya membaca checksum, binary gambar tidak pernah dimuat
+                    'image_url': _image_url('preacher.preacher', p['id'], 'image', p.get('image_checksum')),
+                    'image_srcset': _image_srcset('preacher.preacher', p['id'], 'image',
+                                                  p.get('image_checksum'), p.get('image_variants_checksum')),
+                    'upcoming_sermon_count': p['upcoming_sermon_count'],
+                    'next_sermon_at': p['next_sermon_at'].isoformat() if p['next_sermon_at'] else None,
+                    'sermons_delivered_count': p['sermons_delivered_count'],
+                }
+            return _stream_json_response(
+                Preacher, preacher_ids,
+                ['id', 'name', 'code', 'specialization_id', 'area_id', 'image_checksum', 'image_variants_checksum',
+                 'upcoming_sermon_count', 'next_sermon_at', 'sermons_delivered_count'],
+                serialize,
+            )
         except Exception as e:
             error_response = {'status': 'error', 'message': str(e)}
             return Response(json.dumps(error_response), content_type='application/json', status=500)
 
     # --- FUNGSI INI DIMODIFIKASI (UNTUK GOOGLE MAPS) ---
     @http.route('/api/v1/mosques/<int:mosque_id>', auth='public', methods=['GET'], type='http', cors='*')
-    def get_mosque_detail(self, mosque_id, **kwargs):
-        """Endpoint untuk mendapatkan detail satu masjid beserta jadwalnya."""
-        
+    def get_mosque_detail(self, mosque_id, include=None, **kwargs):
+        """
+        Endpoint untuk mendapatkan detail satu masjid beserta jadwalnya.
+        include: ekspansi relasi dipisah koma ('schedules', default: schedules).
+        Jumlah query tetap: satu read masjid (+ nama area) dan satu search_read jadwal.
+        """
+        etag, last_modified = _data_fingerprint(['mosque.mosque', 'area.area', 'sermon.schedule', 'preacher.preacher'])
+        if _not_modified(etag, last_modified):
+            return _not_modified_response(etag, last_modified)
+
         # Gunakan .sudo() untuk bypass izin baca public user (untuk area, lat, lon)
-        mosque = request.env['mosque.mosque'].sudo().browse(mosque_id)
-        if not mosque.exists():
+        mosques = request.env['mosque.mosque'].sudo().search_read(
+            [('id', '=', mosque_id)],
+            ['name', 'code', 'area_id', 'full_address', 'description', 'image_checksum', 'image_variants_checksum',
+             'latitude', 'longitude'],
+        )
+        if not mosques:
             error_response = {'status': 'error', 'message': 'Mosque not found'}
             return Response(json.dumps(error_response), content_type='application/json', status=404)
-        
-        # Jadwal (ir.rule publik sudah memperbolehkan ini)
-        schedules = request.env['sermon.schedule'].search_read(
-            [('mosque_id', '=', mosque_id), ('state', '=', 'confirmed')],
-            ['id', 'topic', 'start_time', 'preacher_id']
-        )
+        mosque = mosques[0]
+        includes = _parse_include(include, ['schedules'])
         
         mosque_data = {
-            'id': mosque.id,
-            'name': mosque.name,
-            'code': mosque.code,
-            'area': mosque.area_id.name if mosque.area_id else None,
-            'full_address': mosque.full_address,
-            'description': mosque.description,
-            'image_url': _get_image_url(mosque, 'image'),
+            'id': mosque['id'],
+            'name': mosque['name'],
+            'code': mosque['code'],
+            'area': mosque['area_id'][1] if mosque['area_id'] else None,
+            'full_address': mosque['full_address'],
+            'description': mosque['description'],
+            'image_url': _image_url('mosque.mosque', mosque['id'], 'image', mosque['image_checksum']),
+            'image_srcset': _image_srcset('mosque.mosque', mosque['id'], 'image',
+                                          mosque['image_checksum'], mosque['image_variants_checksum']),
             
             # --- TAMBAHAN BARU UNTUK GOOGLE MAPS ---
-            'latitude': mosque.latitude,
-            'longitude': mosque.longitude,
+            'latitude': mosque['latitude'],
+            'longitude': mosque['longitude'],
             # -------------------------------------
-            
-            'schedules': [
-                {
-                    'id': s['id'],
-                    'topic': s['topic'],
-                    'start_time': s['start_time'].isoformat() if s.get('start_time') else None,
-                    'preacher_id': s['preacher_id'][0],
-                    'preacher_name': s['preacher_id'][1],
-                } for s in schedules
-            ]
         }
+        if 'schedules' in includes:
+            # Hanya jadwal confirmed, sama untuk semua pemanggil (dibaca dengan sudo)
+            mosque_data['schedules'] = _read_schedules(
+                [('mosque_id', '=', mosque_id), ('state', '=', 'confirmed')], 'preacher_id')
         response_data = {'status': 'success', 'data': mosque_data}
+        response = Response(json.dumps(response_data), content_type='application/json', status=200)
+        return _set_cache_headers(response, etag, last_modified)
+
+    @http.route('/api/v1/mosques/<int:mosque_id>/recommended_preachers', auth='user', methods=['GET'], type='http', cors='*')
+    def get_recommended_preachers(self, mosque_id, specialization_id=None, at=None, duration=None, limit=None, **kwargs):
+        """
+        Endpoint rekomendasi pendakwah untuk pengurus masjid, urut skor tertinggi.
+        Skor: kedekatan area (hierarki & koordinat), riwayat ceramah di masjid ini,
+        dan kecocokan specialization_id (opsional). Jika 'at' (datetime UTC) diisi,
+        pendakwah yang sudah memiliki jadwal aktif pada [at, at + duration menit) tidak ditampilkan.
+        Hanya untuk pengurus masjid tersebut (atau administrator).
+        """
+        mosque = request.env['mosque.mosque'].sudo().browse(mosque_id).exists()
+        if not mosque:
+            error_response = {'status': 'error', 'message': 'Mosque not found'}
+            return Response(json.dumps(error_response), content_type='application/json', status=404)
+        if request.uid not in mosque.manager_user_ids.ids and not request.env.user.has_group('base.group_system'):
+            error_response = {'status': 'error', 'message': 'Only a board member of this mosque can see recommendations.'}
+            return Response(json.dumps(error_response), content_type='application/json', status=403)
+        try:
+            specialization_id = int(specialization_id) if specialization_id else None
+            start = fields.Datetime.to_datetime(at) if at else None
+            end = start + timedelta(minutes=int(duration or DEFAULT_FREE_SLOT_MINUTES)) if start else None
+        except ValueError:
+            error_response = {'status': 'error', 'message': 'Invalid specialization_id, at or duration'}
+            return Response(json.dumps(error_response), content_type='application/json', status=400)
+
+        ranked = mosque._get_recommended_preachers(specialization_id, start, end,
+                                                   limit=_parse_limit(limit, default=20, maximum=MAX_SEARCH_LIMIT))
+        scores = dict(ranked)
+        preachers = {preacher['id']: preacher for preacher in request.env['preacher.preacher'].sudo().search_read(
+            [('id', 'in', list(scores))],
+            ['name', 'code', 'specialization_id', 'area_id', 'image_checksum', 'image_variants_checksum',
+             'sermons_delivered_count'],
+        )}
+        data = []
+        for preacher_id, score in ranked:
+            preacher = preachers[preacher_id]
+            data.append({
+                'id': preacher_id,
+                'name': preacher['name'],
+                'code': preacher['code'],
+                'specialization': preacher['specialization_id'][1] if preacher['specialization_id'] else None,
+                'area': preacher['area_id'][1] if preacher['area_id'] else None,
+                'image_url': _image_url('preacher.preacher', preacher_id, 'image', preacher['image_checksum']),
+                'image_srcset': _image_srcset('preacher.preacher', preacher_id, 'image',
+                                              preacher['image_checksum'], preacher['image_variants_checksum']),
+                'sermons_delivered_count': preacher['sermons_delivered_count'],
+                'score': score,
+            })
+        response_data = {'status': 'success', 'data': data}
         return Response(json.dumps(response_data), content_type='application/json', status=200)
 
     @http.route('/api/v1/preachers/<int:preacher_id>', auth='public', methods=['GET'], type='http', cors='*')
-    def get_preacher_detail(self, preacher_id, **kwargs):
-        """Endpoint untuk mendapatkan detail satu pendakwah beserta jadwalnya."""
+    def get_preacher_detail(self, preacher_id, include=None, **kwargs):
+        """
+        Endpoint untuk mendapatkan detail satu pendakwah beserta jadwalnya.
+        include: ekspansi relasi dipisah koma ('schedules', 'content'; default: schedules).
+        """
         # .sudo() untuk membaca relasi (area/specialization)
-        preacher = request.env['preacher.preacher'].sudo().browse(preacher_id)
-        if not preacher.exists():
+        preachers = request.env['preacher.preacher'].sudo().search_read(
+            [('id', '=', preacher_id)],
+            ['name', 'code', 'specialization_id', 'area_id', 'bio', 'image_checksum', 'image_variants_checksum'],
+        )
+        if not preachers:
             error_response = {'status': 'error', 'message': 'Preacher not found'}
             return Response(json.dumps(error_response), content_type='application/json', status=404)
+        preacher = preachers[0]
+        includes = _parse_include(include, ['schedules', 'content'])
 
-        schedules = request.env['sermon.schedule'].search_read(
-            [('preacher_id', '=', preacher_id), ('state', '=', 'confirmed')],
-            ['id', 'topic', 'start_time', 'mosque_id']
-        )
-        
         preacher_data = {
-            'id': preacher.id,
-            'name': preacher.name,
-            'code': preacher.code,
-            'specialization': preacher.specialization_id.name if preacher.specialization_id else None,
-            'area': preacher.area_id.name if preacher.area_id else None,
-            'bio': preacher.bio,
-            'image_url': _get_image_url(preacher, 'image'),
-            'schedules': [
-                 {
-                    'id': s['id'],
-                    'topic': s['topic'],
-                    'start_time': s['start_time'].isoformat() if s.get('start_time') else None,
-                    'mosque_id': s['mosque_id'][0],
-                    'mosque_name': s['mosque_id'][1],
-                } for s in schedules
-            ]
+            'id': preacher['id'],
+            'name': preacher['name'],
+            'code': preacher['code'],
+            'specialization': preacher['specialization_id'][1] if preacher['specialization_id'] else None,
+            'area': preacher['area_id'][1] if preacher['area_id'] else None,
+            'bio': preacher['bio'],
+            'image_url': _image_url('preacher.preacher', preacher['id'], 'image', preacher['image_checksum']),
+            'image_srcset': _image_srcset('preacher.preacher', preacher['id'], 'image',
+                                          preacher['image_checksum'], preacher['image_variants_checksum']),
         }
+        if 'schedules' in includes:
+            preacher_data['schedules'] = _read_schedules(
+                [('preacher_id', '=', preacher_id), ('state', '=', 'confirmed')], 'mosque_id')
+        if 'content' in includes:
+            preacher_data['content'] = _read_contents(
+                [('preacher_id', '=', preacher_id), ('state', '=', 'published')])
         response_data = {'status': 'success', 'data': preacher_data}
         return Response(json.dumps(response_data), content_type='application/json', status=200)
 
+    @http.route('/api/v1/preachers/<int:preacher_id>/free_slots', auth='public', methods=['GET'], type='http', cors='*')
+    def get_preacher_free_slots(self, preacher_id, date_from=None, date_to=None, duration=None, **kwargs):
+        """
+        Endpoint slot waktu kosong pendakwah (UTC) untuk membantu pengurus memilih waktu proposal.
+        date_from/date_to: datetime UTC (default: sekarang s/d 7 hari), maksimal MAX_FREE_SLOT_DAYS hari.
+        duration: durasi minimal slot dalam menit (default DEFAULT_FREE_SLOT_MINUTES).
+        Pengunjung anonim hanya melihat jadwal confirmed sebagai waktu sibuk, sehingga
+        undangan yang belum dijawab ('sent') tidak terbuka untuk publik.
+        """
+        preacher = request.env['preacher.preacher'].sudo().browse(preacher_id).exists()
+        if not preacher:
+            error_response = {'status': 'error', 'message': 'Preacher not found'}
+            return Response(json.dumps(error_response), content_type='application/json', status=404)
+        try:
+            start = fields.Datetime.to_datetime(date_from) if date_from else fields.Datetime.now()
+            end = fields.Datetime.to_datetime(date_to) if date_to else start + timedelta(days=7)
+            min_duration = timedelta(minutes=int(duration or DEFAULT_FREE_SLOT_MINUTES))
+        except ValueError:
+            error_response = {'status': 'error', 'message': 'Invalid date_from, date_to or duration'}
+            return Response(json.dumps(error_response), content_type='application/json', status=400)
+        if end <= start or min_duration <= timedelta(0):
+            error_response = {'status': 'error', 'message': 'date_to must be after date_from and duration positive'}
+            return Response(json.dumps(error_response), content_type='application/json', status=400)
+        end = min(end, start + timedelta(days=MAX_FREE_SLOT_DAYS))
+
+        busy_states = ('confirmed',) if request.env.user._is_public() else SCHEDULE_BLOCKING_STATES
+        slots = request.env['sermon.schedule'].sudo()._get_free_slots(preacher.id, start, end, min_duration,
+                                                                      busy_states)
+        response_data = {
+            'status': 'success',
+            'data': [{'start': slot_start.isoformat(), 'end': slot_end.isoformat()} for slot_start, slot_end in slots],
+        }
+        return Response(json.dumps(response_data), content_type='application/json', status=200)
+
     @http.route('/api/v1/areas', auth='public', methods=['GET'], type='http', cors='*')
     def get_areas(self, **kwargs):
         """Endpoint untuk mendapatkan daftar semua area."""
         try:
-            areas = request.env['area.area'].search_read([], ['id', 'name'], order='name ASC')
-            response_data = {'status': 'success', 'data': areas}
-            return Response(json.dumps(response_data), content_type='application/json', status=200)
+            # Payload di-cache di memori worker (lihat masjida.api.cache.mixin)
+            areas, etag, last_modified = request.env['area.area']._get_api_payload()
+            if _not_modified(etag, last_modified):
+                return _not_modified_response(etag, last_modified, REFERENCE_CACHE_MAX_AGE)
+
+            response_data = {'status': 'success', 'data': list(areas)}
+            response = Response(json.dumps(response_data), content_type='application/json', status=200)
+            return _set_cache_headers(response, etag, last_modified, REFERENCE_CACHE_MAX_AGE)
         except Exception as e:
             _logger.error(f"Error saat get_areas: {e}", exc_info=True)
             error_response = {'status': 'error', 'message': str(e)}
@@ -202,21 +702,158 @@ class SermonAPIController(http.Controller):
     def get_specializations(self, **kwargs):
         """Endpoint untuk mendapatkan daftar semua spesialisasi."""
         try:
-            specializations = request.env['preacher.specialization'].search_read([], ['id', 'name'], order='name ASC')
-            response_data = {'status': 'success', 'data': specializations}
-            return Response(json.dumps(response_data), content_type='application/json', status=200)
+            # Payload di-cache di memori worker (lihat masjida.api.cache.mixin)
+            specializations, etag, last_modified = request.env['preacher.specialization']._get_api_payload()
+            if _not_modified(etag, last_modified):
+                return _not_modified_response(etag, last_modified, REFERENCE_CACHE_MAX_AGE)
+
+            response_data = {'status': 'success', 'data': list(specializations)}
+            response = Response(json.dumps(response_data), content_type='application/json', status=200)
+            return _set_cache_headers(response, etag, last_modified, REFERENCE_CACHE_MAX_AGE)
         except Exception as e:
             _logger.error(f"Error saat get_specializations: {e}", exc_info=True)
             error_response = {'status': 'error', 'message': str(e)}
             return Response(json.dumps(error_response), content_type='application/json', status=500)
 
+    @http.route('/api/v1/content', auth='public', methods=['GET'], type='http', cors='*')
+    def get_content_feed(self, preacher_id=None, content_type=None, limit=None, cursor=None, **kwargs):
+        """
+        Feed konten dakwah (sermon.content) yang sudah published, terbaru lebih dulu.
+        Filter: preacher_id, content_type (text/image/video).
+        Paginasi keyset pada (publish_date, id): kirim 'next_cursor' sebagai 'cursor'.
+        """
+        try:
+            domain = [('state', '=', 'published'), ('publish_date', '!=', False)]
+            if preacher_id:
+                try:
+                    domain.append(('preacher_id', '=', int(preacher_id)))
+                except (ValueError, TypeError):
+                    _logger.warning(f"Invalid preacher_id passed: {preacher_id}")
+            if content_type:
+                domain.append(('content_type', '=', content_type))
+
+            if cursor:
+                try:
+                    last_date, last_id = _decode_cursor(cursor)
+                    last_date = fields.Datetime.to_datetime(last_date)
+                    last_id = int(last_id)
+                except (ValueError, TypeError):
+                    error_response = {'status': 'error', 'message': 'Invalid cursor.'}
+                    return Response(json.dumps(error_response), content_type='application/json', status=400)
+                # publish_date <= last_date membatasi scan index (state, publish_date DESC, id DESC)
+                domain += [
+                    ('publish_date', '<=', last_date),
+                    '|', ('publish_date', '<', last_date), ('id', '<', last_id),
+                ]
+
+            page_limit = _parse_limit(limit)
+            # .sudo() agar user portal yang login juga melihat semua konten published
+            contents_raw = request.env['sermon.content'].sudo().search_read(
+                domain,
+                ['id', 'name', 'content_type', 'excerpt', 'video_url', 'publish_date', 'preacher_id',
+                 'image_checksum', 'image_variants_checksum'],
+                order='publish_date DESC, id DESC',
+                limit=page_limit + 1,
+            )
+            has_more = len(contents_raw) > page_limit
+            contents_raw = contents_raw[:page_limit]
+
+            contents_data = [{
+                'id': c['id'],
+                'name': c['name'],
+                'content_type': c['content_type'],
+                'excerpt': c['excerpt'] or None,
+                'video_url': c['video_url'] or None,
+                'image_url': _image_url('sermon.content', c['id'], 'image_content', c['image_checksum']),
+                'image_srcset': _image_srcset('sermon.content', c['id'], 'image_content',
+                                              c['image_checksum'], c['image_variants_checksum']),
+                'publish_date': c['publish_date'].isoformat(),
+                'preacher_id': c['preacher_id'][0] if c.get('preacher_id') else None,
+                'preacher_name': c['preacher_id'][1] if c.get('preacher_id') else None,
+            } for c in contents_raw]
+
+            next_cursor = None
+            if has_more:
+                last = contents_raw[-1]
+                next_cursor = _encode_cursor([fields.Datetime.to_string(last['publish_date']), last['id']])
+
+            response_data = {
+                'status': 'success',
+                'count': len(contents_data),
+                'data': contents_data,
+                'next_cursor': next_cursor,
+            }
+            return Response(json.dumps(response_data), content_type='application/json', status=200)
+        except Exception as e:
+            _logger.error(f"Error saat get_content_feed: {e}", exc_info=True)
+            error_response = {'status': 'error', 'message': str(e)}
+            return Response(json.dumps(error_response), content_type='application/json', status=500)
+
+    @http.route('/api/v1/sync', auth='public', methods=['GET'], type='http', cors='*')
+    def sync(self, since=None, **kwargs):
+        """
+        Sinkronisasi delta untuk aplikasi mobile.
+        Tanpa 'since' (atau token yang terlalu lama) -> semua data ('full': true).
+        Dengan 'since' -> hanya record yang dibuat/diubah sejak token ('updated') dan
+        id yang dihapus atau tidak lagi tampil ('deleted'). Simpan 'token' untuk sync berikutnya.
+        """
+        try:
+            cr = request.env.cr
+            cr.execute("SELECT (now() AT TIME ZONE 'UTC')")
+            server_now = cr.fetchone()[0]
+
+            since_date = None
+            if since:
+                try:
+                    since_date = fields.Datetime.to_datetime(_decode_cursor(since)[0])
+                except (ValueError, TypeError, IndexError):
+                    error_response = {'status': 'error', 'message': 'Invalid sync token.'}
+                    return Response(json.dumps(error_response), content_type='application/json', status=400)
+                if since_date < server_now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS):
+                    since_date = None  # Tombstone sudah dibersihkan, kirim ulang semua data
+
+            sync_data = {}
+            for key, (model_name, field_names, visible_domain) in SYNC_MODELS.items():
+                model = request.env[model_name].sudo()
+                changed_domain = [('write_date', '>', since_date)] if since_date else []
+                records = model.search_read(changed_domain + visible_domain, field_names)
+                updated = [{name: _sync_value(record[name]) for name in ['id'] + field_names} for record in records]
+
+                deleted = []
+                if since_date:
+                    # Record yang berubah dan tidak lagi tampil (misal jadwal dibatalkan)
+                    if visible_domain:
+                        deleted += model.search(changed_domain + ['!'] + expression.normalize_domain(visible_domain)).ids
+                    tombstones = request.env['masjida.sync.tombstone'].sudo().search_read(
+                        [('model', '=', model_name), ('deleted_at', '>', since_date)], ['res_id'])
+                    deleted += [t['res_id'] for t in tombstones]
+
+                sync_data[key] = {'updated': updated, 'deleted': sorted(set(deleted))}
+
+            token = _encode_cursor([fields.Datetime.to_string(server_now - timedelta(seconds=SYNC_OVERLAP_SECONDS))])
+            response_data = {
+                'status': 'success',
+                'full': since_date is None,
+                'token': token,
+                'data': sync_data,
+            }
+            return Response(json.dumps(response_data), content_type='application/json', status=200)
+        except Exception as e:
+            _logger.error(f"Error saat sync: {e}", exc_info=True)
+            error_response = {'status': 'error', 'message': str(e)}
+            return Response(json.dumps(error_response), content_type='application/json', status=500)
+
     # --- ENDPOINT BARU UNTUK HALAMAN JADWAL PUBLIK ---
     @http.route('/api/v1/schedules/public', auth='public', methods=['GET'], type='http', cors='*')
-    def get_public_schedules(self, search=None, area_id=None, day_of_week=None, **kwargs):
+    def get_public_schedules(self, search=None, area_id=None, include_children=None, day_of_week=None,
+                             time_from=None, time_to=None, **kwargs):
         """
         Endpoint untuk mendapatkan daftar jadwal publik (confirmed & future).
         Mendukung pencarian (topik, pendakwah), filter area, dan filter hari (day_of_week).
+        include_children=1: filter area juga mencakup seluruh sub-area.
         day_of_week: 0=Senin, 1=Selasa, ..., 6=Minggu (sesuai Python .weekday())
+        time_from / time_to: jendela jam mulai 'HH:MM' (opsional).
+        Hari dan jam dihitung dalam waktu lokal masjid (Asia/Jakarta), bukan UTC.
         """
         _logger.info(f"get_public_schedules dipanggil dengan search: {search}, area_id: {area_id}, day_of_week: {day_of_week}")
         
@@ -228,55 +865,45 @@ class SermonAPIController(http.Controller):
             ]
 
             # 2. Filter Pencarian (Topik / Pendakwah)
+            # search_text berisi topik + nama pendakwah (index trigram, tanpa join)
             if search:
-                domain += [
-                    '|',
-                    ('topic', 'ilike', search),
-                    ('preacher_id.name', 'ilike', search)
-                ]
+                domain.append(('search_text', 'ilike', normalize_search_text(search)))
 
             # 3. Filter Area (Area Masjid)
             if area_id:
                 try:
-                    domain.append(('mosque_id.area_id', '=', int(area_id)))
+                    domain.append(('mosque_id.area_id', _area_operator(include_children), int(area_id)))
                 except (ValueError, TypeError):
                     _logger.warning(f"Invalid area_id passed: {area_id}")
                     pass # Abaikan area_id yang tidak valid
 
-            # 4. Ambil Field yang Diperlukan
+            # 4. Filter Hari & Jam (di SQL, memakai kolom lokal start_weekday/start_minute)
+            if day_of_week:
+                try:
+                    domain.append(('start_weekday', '=', int(day_of_week)))
+                except (ValueError, TypeError):
+                    _logger.warning(f"Invalid day_of_week passed: {day_of_week}")
+            minute_from = _parse_time_of_day(time_from)
+            if minute_from is not None:
+                domain.append(('start_minute', '>=', minute_from))
+            minute_to = _parse_time_of_day(time_to)
+            if minute_to is not None:
+                domain.append(('start_minute', '<=', minute_to))
+
+            # 5. Ambil Field yang Diperlukan
             fields_to_read = ['id', 'topic', 'start_time', 'preacher_id', 'mosque_id']
             
-            # 5. Search Odoo (tanpa filter hari)
+            # 6. Search Odoo
             # .sudo() diperlukan agar public user bisa filter by preacher.name / mosque.area_id
-            schedules_raw = request.env['sermon.schedule'].sudo().search_read(
+            Schedule = request.env['sermon.schedule'].sudo()
+            schedule_ids = Schedule.search(
                 domain,
-                fields_to_read,
                 order='start_time ASC' # Urutkan dari yang paling dekat
-            )
+            ).ids
 
-            # 6. Filter Hari (Python-side)
-            final_schedules = []
-            
-            dow_filter = None
-            if day_of_week:
-                try:
-                    dow_filter = int(day_of_week)
-                except (ValueError, TypeError):
-                    dow_filter = None
-
-            for s in schedules_raw:
-                # 'start_time' adalah objek datetime dari Odoo
-                if not s.get('start_time'):
-                    continue 
-                
-                # Filter berdasarkan Hari (jika ada)
-                if dow_filter is not None:
-                    # .weekday() -> Senin=0, Minggu=6
-                    if s['start_time'].weekday() != dow_filter:
-                        continue # Lewati jika harinya tidak cocok
-                
-                # 7. Format Data (Data yang lolos filter)
-                final_schedules.append({
+            # 7. Format Data & Kirim Respon (streaming per chunk)
+            def serialize(s):
+                return {
                     'id': s['id'],
                     'topic': s['topic'],
                     'start_time': s['start_time'].isoformat(),
@@ -284,16 +911,8 @@ class SermonAPIController(http.Controller):
                     'mosque_name': s['mosque_id'][1] if s.get('mosque_id') else 'N/A',
                     'mosque_id': s['mosque_id'][0] if s.get('mosque_id') else None,
                     # (Kita tidak perlu mosque_area_name di list, mosque_name sudah cukup)
-                })
-
-            # 8. Kirim Respon
-            response_data = {
-                'status': 'success',
-                'count': len(final_schedules),
-                'data': final_schedules
-            }
-            # default=str digunakan untuk menangani objek datetime (meskipun sudah isoformat)
-            return Response(json.dumps(response_data, default=str), content_type='application/json', status=200)
+                }
+            return _stream_json_response(Schedule, schedule_ids, fields_to_read, serialize)
 
         except Exception as e:
             _logger.error(f"Error saat get_public_schedules: {e}", exc_info=True)
@@ -301,6 +920,81 @@ class SermonAPIController(http.Controller):
             return Response(json.dumps(error_response), content_type='application/json', status=500)
     # --------------------------------------------------
 
+    @http.route('/api/v1/search', auth='public', methods=['GET'], type='http', cors='*')
+    def search_all(self, q=None, types=None, limit=None, **kwargs):
+        """
+        Pencarian gabungan masjid, pendakwah dan jadwal publik.
+        Hasil diurutkan berdasarkan skor (trigram similarity) dan diberi 'type'.
+        types: filter tipe dipisah koma (mosque,preacher,schedule). Default semua.
+        """
+        try:
+            if not q or not normalize_search_text(q):
+                return Response(json.dumps({'status': 'success', 'count': 0, 'data': []}),
+                                content_type='application/json', status=200)
+
+            page_limit = _parse_limit(limit, default=20, maximum=MAX_SEARCH_LIMIT)
+            search_types = _parse_projection(types, SEARCH_TYPES)
+
+            hits = []
+            for search_type in search_types:
+                model = request.env[SEARCH_TYPES[search_type]]
+                if search_type == 'schedule':
+                    # .sudo() agar user portal yang login tetap melihat semua jadwal publik
+                    # (domain publik dibatasi oleh _search_public_domain)
+                    model = model.sudo()
+                ranked = model._search_ranked(q, limit=page_limit)
+                hits += self._format_search_hits(search_type, model, ranked)
+
+            hits.sort(key=lambda hit: -hit['score'])
+            hits = hits[:page_limit]
+            response_data = {'status': 'success', 'count': len(hits), 'data': hits}
+            return Response(json.dumps(response_data), content_type='application/json', status=200)
+        except Exception as e:
+            _logger.error(f"Error saat search_all: {e}", exc_info=True)
+            error_response = {'status': 'error', 'message': str(e)}
+            return Response(json.dumps(error_response), content_type='application/json', status=500)
+
+    def _format_search_hits(self, search_type, model, ranked):
+        """Membaca field tampilan untuk hasil pencarian dalam satu query per tipe."""
+        if not ranked:
+            return []
+        scores = dict(ranked)
+        if search_type == 'mosque':
+            rows = model.browse(scores).read(['name', 'area_id', 'image_checksum', 'image_variants_checksum'])
+            return [{
+                'type': 'mosque',
+                'id': r['id'],
+                'name': r['name'],
+                'subtitle': r['area_id'][1] if r.get('area_id') else None,
+                'image_url': _image_url('mosque.mosque', r['id'], 'image', r.get('image_checksum')),
+                'image_srcset': _image_srcset('mosque.mosque', r['id'], 'image',
+                                              r.get('image_checksum'), r.get('image_variants_checksum')),
+                'score': scores[r['id']],
+            } for r in rows]
+        if search_type == 'preacher':
+            rows = model.browse(scores).read(['name', 'specialization_id', 'image_checksum', 'image_variants_checksum'])
+            return [{
+                'type': 'preacher',
+                'id': r['id'],
+                'name': r['name'],
+                'subtitle': r['specialization_id'][1] if r.get('specialization_id') else None,
+                'image_url': _image_url('preacher.preacher', r['id'], 'image', r.get('image_checksum')),
+                'image_srcset': _image_srcset('preacher.preacher', r['id'], 'image',
+                                              r.get('image_checksum'), r.get('image_variants_checksum')),
+                'score': scores[r['id']],
+            } for r in rows]
+        rows = model.browse(scores).read(['topic', 'start_time', 'preacher_id', 'mosque_id'])
+        return [{
+            'type': 'schedule',
+            'id': r['id'],
+            'name': r['topic'],
+            'subtitle': r['preacher_id'][1] if r.get('preacher_id') else None,
+            'start_time': r['start_time'].isoformat() if r.get('start_time') else None,
+            'mosque_id': r['mosque_id'][0] if r.get('mosque_id') else None,
+            'mosque_name': r['mosque_id'][1] if r.get('mosque_id') else None,
+            'score': scores[r['id']],
+        } for r in rows]
+
     @http.route('/api/register_user', type='json', auth='public', methods=['POST'], csrf=False)
     def register_user(self, **kw):
         """
@@ -348,50 +1042,55 @@ class SermonAPIController(http.Controller):
 
 
     @http.route('/api/profile', type='http', auth='user', methods=['GET'], csrf=False)
-    def get_preacher_profile(self, **kw):
-        """Mengambil profil lengkap Pendakwah (preacher) yang sedang login."""
+    def get_preacher_profile(self, include=None, **kw):
+        """
+        Mengambil profil lengkap Pendakwah (preacher) yang sedang login.
+        include: ekspansi relasi dipisah koma ('schedules', 'content'; default: schedules).
+        """
         try:
-            user = request.env['preacher.preacher'].sudo().search([('user_id', '=', request.uid)], limit=1)
-            if not user:
+            users = request.env['preacher.preacher'].sudo().search_read(
+                [('user_id', '=', request.uid)],
+                ['name', 'area_id', 'specialization_id', 'email', 'image_checksum', 'image_variants_checksum',
+                 'gender', 'date_of_birth',
+                 'phone', 'education', 'bio', 'code', 'period', 'state'],
+                limit=1,
+            )
+            if not users:
                 error_response = {'status': 'error', 'message': 'Profil pendakwah tidak ditemukan.'}
                 return Response(json.dumps(error_response), content_type='application/json', status=404)
-
-            schedules = request.env['sermon.schedule'].search_read(
-                [('preacher_id', '=', user.id), ('state', '=', 'confirmed')],
-                ['id', 'topic', 'start_time', 'mosque_id']
-            )
+            user = users[0]
+            includes = _parse_include(include, ['schedules', 'content'])
             
             profile_data = {
-                'id': user.id,
-                'name': user.name,
+                'id': user['id'],
+                'name': user['name'],
                 
-                'area_id': user.area_id.id or None,
-                'area_name': user.area_id.name if user.area_id else None,
+                'area_id': user['area_id'][0] if user['area_id'] else None,
+                'area_name': user['area_id'][1] if user['area_id'] else None,
                 
-                'specialization_id': user.specialization_id.id or None,
-                'specialization_name': user.specialization_id.name if user.specialization_id else None,
+                'specialization_id': user['specialization_id'][0] if user['specialization_id'] else None,
+                'specialization_name': user['specialization_id'][1] if user['specialization_id'] else None,
                 
-                'email': user.email,
-                'image_url': _get_image_url(user, 'image'),
+                'email': user['email'],
+                'image_url': _image_url('preacher.preacher', user['id'], 'image', user['image_checksum']),
+                'image_srcset': _image_srcset('preacher.preacher', user['id'], 'image',
+                                              user['image_checksum'], user['image_variants_checksum']),
                 'user_type': 'preacher',
-                'gender': user.gender,
-                'date_of_birth': user.date_of_birth.isoformat() if user.date_of_birth else None,
-                'phone': user.phone,
-                'education': user.education,
-                'bio': user.bio,
-                'code': user.code,
-                'period': user.period,
-                'schedules': [
-                 {
-                    'id': s['id'],
-                    'topic': s['topic'],
-                    'start_time': s['start_time'].isoformat() if s.get('start_time') else None,
-                    'mosque_id': s['mosque_id'][0],
-                    'mosque_name': s['mosque_id'][1],
-                } for s in schedules
-                ],
-                'state': user.state,
+                'gender': user['gender'],
+                'date_of_birth': user['date_of_birth'].isoformat() if user['date_of_birth'] else None,
+                'phone': user['phone'],
+                'education': user['education'],
+                'bio': user['bio'],
+                'code': user['code'],
+                'period': user['period'],
+                'state': user['state'],
             }
+            if 'schedules' in includes:
+                profile_data['schedules'] = _read_schedules(
+                    [('preacher_id', '=', user['id']), ('state', '=', 'confirmed')], 'mosque_id')
+            if 'content' in includes:
+                # Konten milik sendiri, termasuk draft
+                profile_data['content'] = _read_contents([('preacher_id', '=', user['id'])])
             return request.make_json_response({'status': 'success', 'data': profile_data})
         except Exception as e:
             _logger.error(f"Error fetching preacher profile: {e}", exc_info=True)
@@ -401,7 +1100,7 @@ class SermonAPIController(http.Controller):
     def update_preacher_profile(self, **kw):
         """
         Memperbarui profil Pendakwah (preacher.preacher) yang sedang login.
-        Menerima 'image' sebagai string base64.
+        Menerima 'image' sebagai string base64, atau 'image_token' dari /api/v1/uploads.
         """
         try:
             user = request.env['preacher.preacher'].sudo().search([('user_id', '=', request.uid)], limit=1)
@@ -435,10 +1134,19 @@ class SermonAPIController(http.Controller):
                          vals_to_update[field] = False
                     elif value is not None:
                         vals_to_update[field] = value
+
+            # Foto yang diunggah bertahap lewat /api/v1/uploads. Field Image harus diproses
+            # (resize max 1024px), jadi isinya dibaca sekali lalu attachment sementara dihapus.
+            image_attachment = None
+            if kw.get('image_token'):
+                image_attachment = request.env['masjida.upload']._consume_token(kw['image_token'])
+                vals_to_update['image'] = image_attachment.datas
             
             if vals_to_update:
                 _logger.info(f"Updating profile for user {request.uid} with values: {list(vals_to_update.keys())}")
                 user.write(vals_to_update) # user sudah .sudo()
+            if image_attachment:
+                image_attachment.unlink()
             
             return {'status': 'success', 'message': 'Profile updated successfully.'}
         except Exception as e:
@@ -507,12 +1215,164 @@ class SermonAPIController(http.Controller):
             _logger.error(f"Error rejecting schedule: {e}", exc_info=True)
             return {'status': 'error', 'message': str(e)}
 
+    @http.route('/api/v1/schedules/batch', auth='user', methods=['POST'], type='json', csrf=False)
+    def batch_schedule_action(self, items=None, **kwargs):
+        """
+        Menerima/menolak banyak undangan jadwal sekaligus.
+        items: list of {'id': <schedule_id>, 'action': 'confirm' | 'reject'}.
+        Kepemilikan dicek dalam satu query, transisi state ditulis per aksi (bulk),
+        dan hasil dikembalikan untuk setiap item.
+        """
+        if not isinstance(items, list) or not items:
+            return {'status': 'error', 'message': 'Field items wajib berupa list.'}
+
+        try:
+            results = []
+            requested = {}
+            for item in items:
+                try:
+                    schedule_id = int(item.get('id'))
+                except (AttributeError, ValueError, TypeError):
+                    results.append({'id': None, 'status': 'error', 'message': 'ID jadwal tidak valid.'})
+                    continue
+                action = item.get('action')
+                if action not in BATCH_SCHEDULE_ACTIONS:
+                    results.append({'id': schedule_id, 'status': 'error', 'message': f'Aksi tidak dikenal: {action}'})
+                    continue
+                if schedule_id in requested:
+                    # ID ganda: dilaporkan, tidak digabung diam-diam ke hasil item pertama
+                    results.append({'id': schedule_id, 'status': 'error', 'action': action,
+                                    'message': 'ID jadwal muncul lebih dari sekali dalam batch.'})
+                    continue
+                requested[schedule_id] = action
+
+            # Satu query: hanya jadwal milik pendakwah yang login
+            Schedule = request.env['sermon.schedule'].sudo()
+            owned = {s['id']: s['state'] for s in Schedule.search_read(
+                [('id', 'in', list(requested)), ('preacher_id.user_id', '=', request.uid)], ['state'])}
+
+            ids_by_action = {action: [] for action in BATCH_SCHEDULE_ACTIONS}
+            for schedule_id, action in requested.items():
+                if schedule_id not in owned:
+                    results.append({'id': schedule_id, 'status': 'error',
+                                    'message': 'Jadwal tidak ditemukan atau Anda tidak berhak.'})
+                elif owned[schedule_id] != 'sent':
+                    results.append({'id': schedule_id, 'status': 'error',
+                                    'message': 'Jadwal tidak sedang menunggu konfirmasi.'})
+                else:
+                    ids_by_action[action].append(schedule_id)
+
+            # Setiap grup aksi ditulis sekaligus dalam savepoint; jika gagal (misal jadwal bentrok),
+            # grup diulang per item agar hanya item yang gagal yang dibatalkan dan dilaporkan.
+            for action, schedule_ids in ids_by_action.items():
+                if not schedule_ids:
+                    continue
+                method = BATCH_SCHEDULE_ACTIONS[action]
+                try:
+                    with request.env.cr.savepoint():
+                        getattr(Schedule.browse(schedule_ids), method)()
+                    results += [{'id': schedule_id, 'status': 'success', 'action': action} for schedule_id in schedule_ids]
+                    continue
+                except (UserError, ValidationError) as e:
+                    if len(schedule_ids) == 1:
+                        results.append({'id': schedule_ids[0], 'status': 'error', 'action': action, 'message': str(e)})
+                        continue
+                for schedule_id in schedule_ids:
+                    try:
+                        with request.env.cr.savepoint():
+                            getattr(Schedule.browse(schedule_id), method)()
+                        results.append({'id': schedule_id, 'status': 'success', 'action': action})
+                    except (UserError, ValidationError) as e:
+                        results.append({'id': schedule_id, 'status': 'error', 'action': action, 'message': str(e)})
+
+            return {'status': 'success', 'results': results}
+        except Exception as e:
+            _logger.error(f"Error processing batch schedule action: {e}", exc_info=True)
+            return {'status': 'error', 'message': str(e)}
+
+    @http.route('/api/v1/uploads', auth='user', methods=['POST'], type='json', csrf=False)
+    def create_upload(self, filename=None, mimetype=None, size=None, **kwargs):
+        """
+        Membuka sesi upload bertahap. Kembalikan 'upload_id' (token) yang dipakai
+        untuk mengirim potongan file lewat PUT /api/v1/uploads/<token>?offset=N.
+        """
+        try:
+            upload = request.env['masjida.upload'].sudo().create({
+                'user_id': request.uid,
+                'filename': filename,
+                'mimetype': mimetype,
+                'size': int(size or 0),
+            })
+            return {'status': 'success', 'upload_id': upload.token, 'received_size': 0}
+        except (ValueError, TypeError, ValidationError) as e:
+            return {'status': 'error', 'message': str(e)}
+        except Exception as e:
+            _logger.error(f"Error creating upload: {e}", exc_info=True)
+            return {'status': 'error', 'message': str(e)}
+
+    @http.route('/api/v1/uploads/<string:token>', auth='user', methods=['GET', 'PUT', 'POST'], type='http', csrf=False)
+    def upload_chunk(self, token, offset=None, **kwargs):
+        """
+        GET: status upload ('received_size' = offset untuk melanjutkan).
+        PUT/POST: body request (raw bytes, bukan base64) adalah potongan file mulai dari 'offset'.
+        Saat semua byte diterima, status menjadi 'done' dan token siap dipakai.
+        """
+        upload = request.env['masjida.upload'].sudo().search(
+            [('token', '=', token), ('user_id', '=', request.uid)], limit=1)
+        if not upload:
+            error_response = {'status': 'error', 'message': 'Upload tidak ditemukan.'}
+            return Response(json.dumps(error_response), content_type='application/json', status=404)
+
+        if request.httprequest.method != 'GET':
+            try:
+                upload._append_chunk(request.httprequest.stream, int(offset or 0))
+            except (ValueError, TypeError, UserError, ValidationError) as e:
+                # Tanpa write: baris upload bisa sedang dikunci oleh request lain (lihat _lock_for_append)
+                error_response = {'status': 'error', 'message': str(e),
+                                  'received_size': upload._get_received_size(update=False)}
+                return Response(json.dumps(error_response), content_type='application/json', status=409)
+            except Exception as e:
+                _logger.error(f"Error receiving upload chunk: {e}", exc_info=True)
+                error_response = {'status': 'error', 'message': str(e)}
+                return Response(json.dumps(error_response), content_type='application/json', status=500)
+
+        response_data = {
+            'status': 'success',
+            'upload_id': upload.token,
+            'state': upload.state,
+            'size': upload.size,
+            'received_size': upload._get_received_size(),
+        }
+        return Response(json.dumps(response_data), content_type='application/json', status=200)
+
+    @http.route('/api/v1/import/<string:target>', auth='user', methods=['POST'], type='http', csrf=False)
+    def import_records(self, target, file=None, **kwargs):
+        """
+        Import massal CSV/XLSX (multipart, field 'file') untuk target 'mosques', 'preachers',
+        'board_members' atau 'schedules' (kolom: lihat masjida.importer._row_to_vals_<target>).
+        Record dibuat per chunk dengan create(vals_list); hak akses mengikuti user yang login.
+        Baris yang gagal dilaporkan per nomor baris tanpa membatalkan baris lain.
+        """
+        if not file:
+            error_response = {'status': 'error', 'message': "Missing CSV/XLSX 'file'"}
+            return Response(json.dumps(error_response), content_type='application/json', status=400)
+        try:
+            Importer = request.env['masjida.importer']
+            result = Importer._import_rows(target, Importer._read_rows(file.stream, file.filename))
+        except (UserError, ValidationError, UnicodeDecodeError) as e:
+            error_response = {'status': 'error', 'message': str(e)}
+            return Response(json.dumps(error_response), content_type='application/json', status=400)
+        response_data = {'status': 'success', 'data': result}
+        return Response(json.dumps(response_data), content_type='application/json', status=200)
+
     @http.route('/api/v1/proposals', auth='user', methods=['POST'], type='json', csrf=False)
     def create_proposal(self, **kw):
         """
         Membuat proposal dakwah (sermon.proposal) dari Pendakwah yang login.
         Endpoint ini memerlukan autentikasi (auth='user').
         preacher_id akan diisi otomatis berdasarkan user yang login (sesuai default model).
+        Lampiran dikirim sebagai 'attachment_file' (base64) atau 'attachment_token'
+        dari /api/v1/uploads.
         """
         data = kw
         _logger.info(f"Menerima permintaan proposal: {data} oleh user {request.uid}")
@@ -523,6 +1383,13 @@ class SermonAPIController(http.Controller):
             return {'status': 'error', 'message': 'Field tidak lengkap (mosque_id, proposed_topic, proposed_start_time).'}
 
         try:
+            attachment_file = data.get('attachment_file')
+            attachment_filename = data.get('attachment_filename')
+            uploaded_attachment = None
+            if data.get('attachment_token'):
+                uploaded_attachment = request.env['masjida.upload']._consume_token(data['attachment_token'])
+                attachment_filename = attachment_filename or uploaded_attachment.name
+
             # Buat proposal baru. preacher_id akan diisi oleh default model
             proposal = request.env['sermon.proposal'].create({
                 'mosque_id': data.get('mosque_id'),
@@ -530,10 +1397,14 @@ class SermonAPIController(http.Controller):
                 'proposed_start_time': data.get('proposed_start_time'),
                 'notes': data.get('notes'),
                 'full_description': data.get('full_description'), # Field baru
-                'attachment_file': data.get('attachment_file'),   # Base64 string dari Flutter
-                'attachment_filename': data.get('attachment_filename'), # Nama file asli
+                'attachment_file': attachment_file,   # Base64 string dari Flutter / upload token
+                'attachment_filename': attachment_filename, # Nama file asli
             })
             
+            # File dari /api/v1/uploads ditautkan langsung (tanpa salinan base64 kedua)
+            if uploaded_attachment:
+                request.env['masjida.upload']._link_attachment(uploaded_attachment, proposal, 'attachment_file')
+
             # Langsung ubah statusnya menjadi 'submitted'
             proposal.action_submit()
             
@@ -547,10 +1418,10 @@ class SermonAPIController(http.Controller):
     @http.route('/api/help/types', type='json', auth='public', methods=['POST'], csrf=False)
     def get_help_types(self, **kwargs):
         """Mengambil daftar jenis bantuan yang dikonfigurasi di Odoo"""
-        types = request.env['masjida.help.type'].sudo().search([('active', '=', True)])
+        types, _etag, _last_modified = request.env['masjida.help.type']._get_api_payload()
         return {
             'status': 200,
-            'data': [{'id': t.id, 'name': t.name} for t in types]
+            'data': list(types)
         }
 
     @http.route('/api/help/submit', type='json', auth='user', methods=['POST'], csrf=False)
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from . import api_cache
+from . import sync
+from . import search
+from . import image_variants
+from . import schedule_stats
 from . import mosque
 from . import preacher
 from . import schedule
@@ -9,3 +14,6 @@ from . import user
 from . import mosque_board
 from . import area
 from . import specialization
+from . import upload
+from . import importer
+from . import job
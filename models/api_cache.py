@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api, tools
+import hashlib
+import json
+
+
+class MasjidaApiCacheMixin(models.AbstractModel):
+    """
+    Mixin untuk data referensi (area, spesialisasi, jenis bantuan) yang dibaca
+    di setiap peluncuran aplikasi. Payload API di-cache di memori setiap worker
+    (ormcache, LRU) dan dibuang saat create/write/unlink. Registry Odoo
+    menyebarkan invalidasi ke worker lain melalui sequence signaling di database.
+    """
+    _name = 'masjida.api.cache.mixin'
+    _description = 'Masjida API Payload Cache Mixin'
+
+    # Field yang dikirim oleh API dan domain record yang ditampilkan
+    _api_fields = ['id', 'name']
+    _api_domain = []
+
+    @api.model
+    @tools.ormcache()
+    def _get_api_payload(self):
+        """
+        Mengembalikan (data, etag, last_modified) untuk endpoint API.
+        Hasil di-cache sampai data model berubah; jangan mengubah isi 'data'.
+        """
+        rows = self.sudo().search_read(self._api_domain, self._api_fields + ['write_date'])
+        last_modified = max((row.pop('write_date') for row in rows), default=None)
+        data = tuple(rows)
+        etag = hashlib.sha1(json.dumps(data, default=str).encode()).hexdigest()
+        return data, etag, last_modified
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import ValidationError
 
 class Area(models.Model):
     _name = 'area.area'
     _description = 'Geographical Area'
+    _inherit = ['masjida.api.cache.mixin', 'masjida.sync.mixin']
     _order = 'name'
+    # parent_path (misal '1/4/9/') membuat filter 'child_of' menjadi satu LIKE prefix, tanpa rekursi
+    _parent_store = True
 
     name = fields.Char(string='Area Name', required=True)
     parent_id = fields.Many2one('area.area', string='Parent Area', index=True, ondelete='cascade')
+    parent_path = fields.Char(index=True, unaccent=False)
 
     _sql_constraints = [
         ('name_uniq', 'unique(name)', 'Area name must be unique!')
@@ -15,3 +20,14 @@ class Area(models.Model):
 
     latitude = fields.Float(string='Latitude', digits=(10, 7))
     longitude = fields.Float(string='Longitude', digits=(10, 7))
+
+    def init(self):
+        super().init()
+        # Index text_pattern_ops agar "parent_path LIKE '1/4/%'" menjadi index range scan
+        tools.create_index(self.env.cr, 'area_area_parent_path_prefix_idx',
+                           self._table, ['parent_path text_pattern_ops'])
+
+    @api.constrains('parent_id')
+    def _check_parent_id(self):
+        if self._has_cycle():
+            raise ValidationError(_("You cannot create recursive areas."))
@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields
+from odoo import models, fields, api, tools
+
+# Panjang maksimal ringkasan (teks polos) content_text untuk feed API
+EXCERPT_LENGTH = 280
 
 class SermonContent(models.Model):
     _name = 'sermon.content'
     _description = 'Sermon Content (Text, Photo, Video)'
+    _inherit = ['masjida.image.variant.mixin']
+    _image_source_field = 'image_content'
 
     name = fields.Char(string='Content Title', required=True)
     preacher_id = fields.Many2one('preacher.preacher', string='By', required=True, ondelete='cascade')
@@ -16,6 +21,8 @@ class SermonContent(models.Model):
     ], string='Content Type', required=True, default='text')
     
     content_text = fields.Html(string='Article Content')
+    excerpt = fields.Text(string='Excerpt', compute='_compute_excerpt', store=True,
+                          help="Plain-text summary of the article used by the content feed.")
     image_content = fields.Image(string='Upload Photo')
     video_url = fields.Char(string='Video URL', help="URL from platforms like YouTube, Vimeo, etc.")
     
@@ -25,6 +32,21 @@ class SermonContent(models.Model):
         ('published', 'Published')
     ], string='Status', default='draft')
 
+    def init(self):
+        super().init()
+        # Index untuk feed konten: hanya published, terbaru lebih dulu (keyset publish_date, id)
+        tools.create_index(self.env.cr, 'sermon_content_state_publish_date_idx',
+                           self._table, ['state', 'publish_date DESC', 'id DESC'])
+
+    @api.depends('content_text')
+    def _compute_excerpt(self):
+        """Ringkasan teks polos dari artikel HTML, dipotong di batas kata."""
+        for record in self:
+            text = ' '.join(tools.html2plaintext(record.content_text or '').split())
+            if len(text) > EXCERPT_LENGTH:
+                text = text[:EXCERPT_LENGTH].rsplit(' ', 1)[0] + '…'
+            record.excerpt = text or False
+
     def action_publish(self):
         """Publish the content to make it visible to public users."""
         self.write({'state': 'published', 'publish_date': fields.Datetime.now()})
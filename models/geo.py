@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Helper geospasial tanpa PostGIS.
+Koordinat dipetakan ke sel grid berukuran GEO_CELL_DEGREES (~11 km) yang disimpan
+sebagai integer ter-index, sehingga pencarian radius cukup memakai 'in' pada
+beberapa sel di sekitar titik pusat.
+"""
+import math
+
+GEO_CELL_DEGREES = 0.1
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+_LON_CELLS = int(round(360 / GEO_CELL_DEGREES))
+
+
+def has_coordinates(latitude, longitude):
+    """Field Float Odoo default 0.0; (0, 0) dianggap belum diisi."""
+    return bool(latitude or longitude)
+
+
+def geo_cell(latitude, longitude):
+    """Nomor sel grid untuk koordinat, atau False jika koordinat kosong."""
+    if not has_coordinates(latitude, longitude):
+        return False
+    lat_index = int(math.floor((latitude + 90) / GEO_CELL_DEGREES))
+    lon_index = int(math.floor((longitude + 180) / GEO_CELL_DEGREES))
+    return lat_index * _LON_CELLS + lon_index
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) yang memuat lingkaran radius_km."""
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return latitude - delta_lat, latitude + delta_lat, longitude - delta_lon, longitude + delta_lon
+
+
+def geo_cells_in_radius(latitude, longitude, radius_km):
+    """Semua nomor sel grid yang beririsan dengan bounding box radius_km."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    lat_range = range(int(math.floor((min_lat + 90) / GEO_CELL_DEGREES)),
+                      int(math.floor((max_lat + 90) / GEO_CELL_DEGREES)) + 1)
+    lon_range = range(int(math.floor((min_lon + 180) / GEO_CELL_DEGREES)),
+                      int(math.floor((max_lon + 180) / GEO_CELL_DEGREES)) + 1)
+    return [lat_index * _LON_CELLS + lon_index for lat_index in lat_range for lon_index in lon_range]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Jarak lingkaran besar (km) antara dua koordinat."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
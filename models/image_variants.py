@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.image import image_process
+import base64
+import hashlib
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Ukuran turunan gambar (px, sisi terpanjang) untuk aplikasi mobile
+IMAGE_VARIANT_SIZES = (128, 256, 512)
+IMAGE_VARIANT_BATCH_SIZE = 20
+
+
+class MasjidaImageVariantMixin(models.AbstractModel):
+    """
+    Mixin turunan gambar (128/256/512 px, WebP jika didukung Pillow).
+    Turunan dibuat oleh cron di luar request: saat gambar sumber berubah, write()
+    hanya menjadwalkan cron, sehingga simpan profil tidak menunggu proses encoding.
+    Mixin juga menyimpan checksum gambar sumber (image_checksum, ter-index) agar API
+    tidak perlu memuat binary hanya untuk mengetahui apakah record memiliki gambar.
+    """
+    _name = 'masjida.image.variant.mixin'
+    _description = 'Masjida Image Variant Mixin'
+
+    # Field gambar sumber pada model turunan
+    _image_source_field = 'image'
+
+    image_checksum = fields.Char(string='Image Checksum', compute='_compute_image_checksum',
+                                 store=True, index=True, readonly=True)
+    image_128 = fields.Binary(string='Image 128', attachment=True, readonly=True)
+    image_256 = fields.Binary(string='Image 256', attachment=True, readonly=True)
+    image_512 = fields.Binary(string='Image 512', attachment=True, readonly=True)
+    # Checksum gambar sumber saat turunan terakhir dibuat
+    image_variants_checksum = fields.Char(string='Image Variants Checksum', readonly=True, copy=False)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if any(vals.get(self._image_source_field) for vals in vals_list):
+            self._trigger_image_variants()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self._image_source_field in vals:
+            self._trigger_image_variants()
+        return res
+
+    @api.depends(lambda self: [self._image_source_field])
+    def _compute_image_checksum(self):
+        """Menyimpan checksum SHA-1 dari gambar sumber; kosong jika tidak ada gambar."""
+        for record in self:
+            image = record.with_context(bin_size=False)[self._image_source_field]
+            record.image_checksum = hashlib.sha1(image).hexdigest() if image else False
+
+    @api.model
+    def _trigger_image_variants(self):
+        cron = self.env.ref('masjida.ir_cron_image_variants', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _encode_image_variant(self, source, size):
+        """Mengubah ukuran gambar (raw bytes) ke WebP; format asli jika WebP tidak tersedia."""
+        try:
+            return image_process(source, size=(size, size), output_format='WEBP')
+        except Exception:
+            return image_process(source, size=(size, size))
+
+    @api.model
+    def _generate_image_variants(self, batch_size=IMAGE_VARIANT_BATCH_SIZE, auto_commit=False):
+        """Membuat turunan untuk record yang checksum sumbernya berbeda dari turunan terakhir."""
+        source_field, checksum_field = self._image_source_field, 'image_checksum'
+        stale = SQL("%s IS DISTINCT FROM %s",
+                    SQL.identifier(checksum_field), SQL.identifier('image_variants_checksum'))
+        done = 0
+        while True:
+            self.flush_model([checksum_field, 'image_variants_checksum'])
+            self.env.cr.execute(SQL("SELECT id FROM %s WHERE %s ORDER BY id LIMIT %s",
+                                    SQL.identifier(self._table), stale, batch_size))
+            ids = [row[0] for row in self.env.cr.fetchall()]
+            if not ids:
+                break
+            for record in self.browse(ids).with_context(bin_size=False):
+                source = record[source_field]
+                vals = {'image_variants_checksum': record[checksum_field]}
+                for size in IMAGE_VARIANT_SIZES:
+                    vals[f'image_{size}'] = False
+                if source:
+                    try:
+                        raw = base64.b64decode(source)
+                        for size in IMAGE_VARIANT_SIZES:
+                            vals[f'image_{size}'] = base64.b64encode(self._encode_image_variant(raw, size))
+                    except Exception as e:
+                        # Gambar rusak: tandai selesai agar tidak diproses berulang
+                        _logger.warning("Cannot build image variants for %s: %s", record, e)
+                record.write(vals)
+            done += len(ids)
+            if auto_commit:
+                self.env.cr.commit()
+            if len(ids) < batch_size:
+                break
+        if done:
+            _logger.info("%s: image variants generated for %s record(s)", self._name, done)
+        return done
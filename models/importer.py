@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import csv
+import io
+import logging
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Jumlah baris yang dibuat dengan satu create(vals_list)
+IMPORT_CHUNK_SIZE = 500
+
+# Target import -> model tujuan
+IMPORT_TARGETS = {
+    'mosques': 'mosque.mosque',
+    'preachers': 'preacher.preacher',
+    'board_members': 'mosque.board',
+    'schedules': 'sermon.schedule',
+}
+
+
+class MasjidaImporter(models.AbstractModel):
+    """
+    Import massal dari file CSV/XLSX. Baris dibaca secara streaming, diubah menjadi
+    vals dengan tabel lookup (nama area/spesialisasi, kode masjid/pendakwah) yang
+    dibangun sekali per file, lalu dibuat dengan satu create(vals_list) per chunk
+    sehingga provisioning user (res.users) juga berjalan per batch. Jika satu chunk
+    gagal, baris di chunk tersebut diulang satu per satu agar error dilaporkan per
+    baris tanpa membatalkan baris lain.
+    """
+    _name = 'masjida.importer'
+    _description = 'Masjida Bulk Importer'
+
+    @api.model
+    def _read_rows(self, fileobj, filename=None):
+        """Generator (nomor_baris, dict) dari file CSV atau XLSX (berdasarkan ekstensi)."""
+        if filename and filename.lower().endswith('.xlsx'):
+            return self._read_xlsx_rows(fileobj)
+        return self._read_csv_rows(fileobj)
+
+    @api.model
+    def _read_csv_rows(self, fileobj):
+        """Generator (nomor_baris, dict) dari file CSV biner; header di baris 1."""
+        reader = csv.DictReader(io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline=''))
+        for line_number, row in enumerate(reader, start=2):
+            yield line_number, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+    @api.model
+    def _read_xlsx_rows(self, fileobj):
+        """Generator (nomor_baris, dict) dari sheet pertama XLSX, dibaca read-only baris demi baris."""
+        if openpyxl is None:
+            raise UserError(_("Reading XLSX files requires the 'openpyxl' Python library."))
+        workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+            for line_number, values in enumerate(rows, start=2):
+                row = {}
+                for key, value in zip(header, values):
+                    if key:
+                        row[key] = '' if value is None else (value if hasattr(value, 'date') else str(value).strip())
+                if any(row.values()):
+                    yield line_number, row
+        finally:
+            workbook.close()
+
+    @api.model
+    def _build_lookups(self, target):
+        """
+        Tabel lookup yang dibangun sekali per file, sehingga relasi tidak dicari per baris.
+        Nama area/spesialisasi dicocokkan tanpa membedakan huruf besar/kecil.
+        """
+        lookups = {}
+        if target in ('mosques', 'preachers'):
+            lookups['area'] = {area['name'].lower(): area['id'] for area in
+                               self.env['area.area'].search_read([], ['name'])}
+        if target == 'preachers':
+            lookups['specialization'] = {spec['name'].lower(): spec['id'] for spec in
+                                         self.env['preacher.specialization'].search_read([], ['name'])}
+        if target in ('board_members', 'schedules'):
+            lookups['mosque'] = {mosque['code']: mosque['id'] for mosque in
+                                 self.env['mosque.mosque'].search_read([], ['code'])}
+        if target == 'schedules':
+            preachers = self.env['preacher.preacher'].search_read([], ['code', 'email'])
+            lookups['preacher'] = {preacher['code']: preacher['id'] for preacher in preachers if preacher['code']}
+            lookups['preacher_email'] = {preacher['email'].lower(): preacher['id']
+                                         for preacher in preachers if preacher['email']}
+        return lookups
+
+    @api.model
+    def _lookup(self, lookups, table, key, column, required=False):
+        """id dari tabel lookup; False jika kolom kosong, UserError jika tidak ditemukan."""
+        if not key:
+            if required:
+                raise UserError(_("Column '%s' is required.", column))
+            return False
+        record_id = lookups[table].get(key.lower() if table in ('area', 'specialization', 'preacher_email') else key)
+        if not record_id:
+            raise UserError(_("Unknown %(column)s '%(value)s'.", column=column, value=key))
+        return record_id
+
+    @api.model
+    def _row_to_vals(self, target, row, lookups):
+        """Mengubah satu baris menjadi vals create; raise UserError jika baris tidak valid."""
+        return getattr(self, f'_row_to_vals_{target}')(row, lookups)
+
+    @api.model
+    def _row_to_vals_mosques(self, row, lookups):
+        if not row.get('code') or not row.get('name'):
+            raise UserError(_("Columns 'code' and 'name' are required."))
+        vals = {
+            'code': row['code'],
+            'name': row['name'],
+            'area_id': self._lookup(lookups, 'area', row.get('area'), 'area', required=True),
+        }
+        for column in ('street', 'city', 'province', 'zip_code', 'phone', 'email', 'website'):
+            if row.get(column):
+                vals[column] = row[column]
+        for column in ('latitude', 'longitude'):
+            if row.get(column):
+                vals[column] = float(row[column])
+        return vals
+
+    @api.model
+    def _row_to_vals_preachers(self, row, lookups):
+        if not row.get('name'):
+            raise UserError(_("Column 'name' is required."))
+        vals = {
+            'name': row['name'],
+            'email': row.get('email') or False,
+            'phone': row.get('phone') or False,
+            'area_id': self._lookup(lookups, 'area', row.get('area'), 'area'),
+            'specialization_id': self._lookup(lookups, 'specialization', row.get('specialization'), 'specialization'),
+        }
+        for column in ('code', 'gender', 'education'):
+            if row.get(column):
+                vals[column] = row[column]
+        return vals
+
+    @api.model
+    def _row_to_vals_board_members(self, row, lookups):
+        if not row.get('name'):
+            raise UserError(_("Column 'name' is required."))
+        vals = {
+            'name': row['name'],
+            'email': row.get('email') or False,
+            'phone': row.get('phone') or False,
+            'mosque_id': self._lookup(lookups, 'mosque', row.get('mosque_code'), 'mosque_code', required=True),
+        }
+        if row.get('position'):
+            vals['position'] = row['position']
+        return vals
+
+    @api.model
+    def _row_to_vals_schedules(self, row, lookups):
+        if not row.get('topic') or not row.get('start_time'):
+            raise UserError(_("Columns 'topic' and 'start_time' are required."))
+        if row.get('preacher_code'):
+            preacher_id = self._lookup(lookups, 'preacher', row['preacher_code'], 'preacher_code')
+        else:
+            preacher_id = self._lookup(lookups, 'preacher_email', row.get('preacher_email'), 'preacher_email',
+                                       required=True)
+        return {
+            'topic': row['topic'],
+            'description': row.get('description') or False,
+            'mosque_id': self._lookup(lookups, 'mosque', row.get('mosque_code'), 'mosque_code', required=True),
+            'preacher_id': preacher_id,
+            'start_time': fields.Datetime.to_datetime(row['start_time']),
+            'end_time': fields.Datetime.to_datetime(row['end_time']) if row.get('end_time') else False,
+        }
+
+    @api.model
+    def _create_chunk(self, model, chunk, errors):
+        """Membuat satu chunk [(nomor_baris, vals)]; mengembalikan jumlah record yang dibuat."""
+        try:
+            with self.env.cr.savepoint():
+                model.create([vals for _line, vals in chunk])
+            return len(chunk)
+        except Exception as e:
+            if len(chunk) == 1:
+                errors.append({'line': chunk[0][0], 'message': str(e)})
+                return 0
+        created = 0
+        for line_number, vals in chunk:
+            try:
+                with self.env.cr.savepoint():
+                    model.create([vals])
+                created += 1
+            except Exception as e:
+                errors.append({'line': line_number, 'message': str(e)})
+        return created
+
+    @api.model
+    def _import_rows(self, target, rows, chunk_size=IMPORT_CHUNK_SIZE):
+        """
+        Mengimpor iterable (nomor_baris, dict) ke model target.
+        Mengembalikan {'created': n, 'errors': [{'line', 'message'}]}.
+        """
+        if target not in IMPORT_TARGETS:
+            raise UserError(_("Unknown import target '%s'.", target))
+        model = self.env[IMPORT_TARGETS[target]]
+        lookups = self._build_lookups(target)
+        created, errors, chunk = 0, [], []
+        for line_number, row in rows:
+            try:
+                chunk.append((line_number, self._row_to_vals(target, row, lookups)))
+            except (UserError, ValueError) as e:
+                errors.append({'line': line_number, 'message': str(e)})
+                continue
+            if len(chunk) >= chunk_size:
+                created += self._create_chunk(model, chunk, errors)
+                chunk = []
+        if chunk:
+            created += self._create_chunk(model, chunk, errors)
+        _logger.info("_import_rows(%s): %s created, %s error(s)", target, created, len(errors))
+        return {'created': created, 'errors': errors}
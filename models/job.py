@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from datetime import timedelta
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Percobaan maksimal per job dan jeda dasar retry (detik, dikali 2 setiap kegagalan)
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_SECONDS = 60
+JOB_BATCH_SIZE = 100
+# Masa simpan job selesai dan job gagal (hari) sebelum dihapus oleh _gc_jobs
+JOB_DONE_RETENTION_DAYS = 7
+JOB_FAILED_RETENTION_DAYS = 30
+
+# Sink pengiriman notifikasi: 'log' (default) atau 'file' (JSON per baris ke masjida.job_sink_file)
+JOB_SINK_PARAM = 'masjida.job_sink'
+JOB_SINK_FILE_PARAM = 'masjida.job_sink_file'
+
+
+class MasjidaJob(models.Model):
+    """
+    Antrian job asinkron di database untuk efek samping (notifikasi, render undangan).
+    Aksi state hanya memasukkan job lalu langsung kembali; cron worker mengambil job
+    dengan FOR UPDATE SKIP LOCKED (aman untuk beberapa worker) dan mengulang job yang
+    gagal dengan backoff eksponensial sampai JOB_MAX_ATTEMPTS.
+    """
+    _name = 'masjida.job'
+    _description = 'Masjida Background Job'
+    _order = 'id desc'
+
+    job_type = fields.Selection([
+        ('notify_preacher', 'Notify Preacher'),         # Undangan jadwal dikirim ke pendakwah
+        ('notify_board', 'Notify Mosque Board'),        # Proposal baru untuk pengurus masjid
+        ('render_invitation', 'Render Invitation'),     # Membuat link undangan WhatsApp
+    ], string='Job Type', required=True, readonly=True)
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    res_id = fields.Integer(string='Record ID', required=True, readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, readonly=True)
+    attempts = fields.Integer(string='Attempts', default=0, readonly=True)
+    next_attempt_at = fields.Datetime(string='Next Attempt At', default=fields.Datetime.now, readonly=True)
+    done_at = fields.Datetime(string='Done At', readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    def init(self):
+        super().init()
+        # Index untuk worker: hanya job pending, urut waktu percobaan berikutnya
+        tools.create_index(self.env.cr, 'masjida_job_pending_idx', self._table,
+                           ['next_attempt_at', 'id'], where="state = 'pending'")
+
+    @api.model
+    def _enqueue(self, job_type, records):
+        """Memasukkan satu job per record lalu membangunkan worker; tidak menunggu eksekusi."""
+        if not records:
+            return self.browse()
+        jobs = self.sudo().create([
+            {'job_type': job_type, 'res_model': records._name, 'res_id': record_id}
+            for record_id in records.ids
+        ])
+        self._trigger_worker()
+        return jobs
+
+    @api.model
+    def _trigger_worker(self, at=None):
+        cron = self.env.ref('masjida.ir_cron_job_worker', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger(at)
+
+    @api.model
+    def _run_jobs(self, batch_size=JOB_BATCH_SIZE, auto_commit=False):
+        """
+        Worker cron: menjalankan job pending yang sudah jatuh tempo, per batch.
+        Setiap job berjalan dalam savepoint sehingga kegagalan satu job tidak
+        membatalkan job lain; job gagal dijadwalkan ulang dengan backoff.
+        """
+        done = 0
+        while True:
+            self.flush_model()
+            self.env.cr.execute(SQL(
+                """SELECT id FROM %s
+                    WHERE state = 'pending' AND next_attempt_at <= %s
+                    ORDER BY next_attempt_at, id LIMIT %s
+                    FOR UPDATE SKIP LOCKED""",
+                SQL.identifier(self._table), fields.Datetime.now(), batch_size,
+            ))
+            ids = [row[0] for row in self.env.cr.fetchall()]
+            if not ids:
+                break
+            for job in self.sudo().browse(ids):
+                job._run_one()
+            done += len(ids)
+            if auto_commit:
+                self.env.cr.commit()
+            if len(ids) < batch_size:
+                break
+        if done:
+            _logger.info("_run_jobs: %s job(s) processed", done)
+        return done
+
+    def _run_one(self):
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                record = self.env[self.res_model].browse(self.res_id).exists()
+                if record:
+                    getattr(self, f'_job_{self.job_type}')(record)
+            self.write({'state': 'done', 'done_at': fields.Datetime.now(), 'attempts': self.attempts + 1})
+        except Exception as e:
+            attempts = self.attempts + 1
+            vals = {'attempts': attempts, 'last_error': str(e)}
+            # UserError (misal nomor telepon pendakwah kosong) tidak akan berhasil jika diulang
+            if isinstance(e, UserError) or attempts >= JOB_MAX_ATTEMPTS:
+                vals['state'] = 'failed'
+                _logger.warning("Job %s (%s) failed permanently: %s", self.id, self.job_type, e)
+            else:
+                vals['next_attempt_at'] = fields.Datetime.now() + timedelta(
+                    seconds=JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+                self._trigger_worker(vals['next_attempt_at'])
+            self.write(vals)
+
+    @api.model
+    def _gc_jobs(self):
+        """Menghapus job selesai/gagal yang melewati masa simpan agar antrian tidak terus membesar."""
+        now = fields.Datetime.now()
+        jobs = self.sudo().search([
+            '|',
+            '&', ('state', '=', 'done'), ('done_at', '<', now - timedelta(days=JOB_DONE_RETENTION_DAYS)),
+            '&', ('state', '=', 'failed'), ('write_date', '<', now - timedelta(days=JOB_FAILED_RETENTION_DAYS)),
+        ])
+        jobs.unlink()
+        _logger.info("_gc_jobs: %s job(s) removed", len(jobs))
+
+    # --- Handler job ---
+
+    def _job_notify_preacher(self, schedule):
+        """Memberitahu pendakwah bahwa ada undangan jadwal baru."""
+        preacher = schedule.preacher_id
+        self._deliver(preacher.email or preacher.phone or preacher.name, 'Undangan Ceramah', {
+            'schedule_id': schedule.id,
+            'mosque': schedule.mosque_id.name,
+            'topic': schedule.topic,
+            'start_time': str(schedule.start_time),
+        })
+
+    def _job_notify_board(self, proposal):
+        """Memberitahu semua pengurus masjid tujuan bahwa ada proposal baru."""
+        for board_member in proposal.mosque_id.board_member_ids:
+            self._deliver(board_member.email or board_member.name, 'Proposal Ceramah Baru', {
+                'proposal_id': proposal.id,
+                'preacher': proposal.preacher_id.name,
+                'topic': proposal.proposed_topic,
+                'proposed_start_time': str(proposal.proposed_start_time),
+            })
+
+    def _job_render_invitation(self, schedule):
+        """Membuat dan menyimpan link undangan WhatsApp agar tombol undangan tidak merender ulang."""
+        schedule.write({'invitation_url': schedule._get_whatsapp_invitation_url()})
+
+    @api.model
+    def _deliver(self, recipient, subject, payload):
+        """
+        Mengirim notifikasi ke sink yang dikonfigurasi (ir.config_parameter masjida.job_sink).
+        'log': ditulis ke log server; 'file': satu baris JSON ditambahkan ke masjida.job_sink_file.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        message = {'recipient': recipient, 'subject': subject, 'payload': payload}
+        if params.get_param(JOB_SINK_PARAM, 'log') == 'file' and params.get_param(JOB_SINK_FILE_PARAM):
+            with open(params.get_param(JOB_SINK_FILE_PARAM), 'a', encoding='utf-8') as sink:
+                sink.write(json.dumps(message) + '\n')
+        else:
+            _logger.info("Notification: %s", json.dumps(message))
@@ -1,10 +1,26 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+
+from .geo import geo_cell, geo_cells_in_radius, bounding_box, haversine_km, has_coordinates
+from .search import normalize_search_text
+from .schedule import INVITATION_MOSQUE_FIELDS
+
+# Bobot skor rekomendasi pendakwah untuk masjid (lihat _get_recommended_preachers)
+RECOMMEND_SAME_AREA_SCORE = 40.0
+RECOMMEND_RELATED_AREA_SCORE = 25.0
+RECOMMEND_DISTANCE_SCORE = 20.0
+RECOMMEND_DISTANCE_RANGE_KM = 50.0
+RECOMMEND_HISTORY_SCORE = 6.0
+RECOMMEND_HISTORY_MAX_COUNT = 5
+RECOMMEND_SPECIALIZATION_SCORE = 20.0
 
 class Mosque(models.Model):
     _name = 'mosque.mosque'
     _description = 'Mosque Master Data Model'
+    _inherit = ['masjida.search.mixin', 'masjida.image.variant.mixin', 'masjida.sync.mixin',
+                'masjida.schedule.stats.mixin']
 
     code = fields.Char(string='code', required=True)
     name = fields.Char(string='Mosque Name', required=True)
@@ -16,7 +32,7 @@ class Mosque(models.Model):
     country_id = fields.Many2one('res.country', string='Country', default=lambda self: self.env.ref('base.id'))
     
     # FIELD BARU: Relasi ke Area
-    area_id = fields.Many2one('area.area', string='Area', required=True)
+    area_id = fields.Many2one('area.area', string='Area', required=True, index=True)
     
     # Computed field yang diperbarui
     full_address = fields.Text(string='Full Address', compute='_compute_full_address', store=True)
@@ -28,9 +44,16 @@ class Mosque(models.Model):
     
     latitude = fields.Float(string='Latitude', digits=(10, 7))
     longitude = fields.Float(string='Longitude', digits=(10, 7))
+    # Sel grid (lihat models/geo.py) ter-index untuk pencarian "masjid terdekat"
+    geo_cell = fields.Integer(string='Geo Cell', compute='_compute_geo_cell', store=True, index=True)
     
     # Relation to Mosque Admins (Backend Users)
     board_member_ids = fields.One2many('mosque.board', 'mosque_id', string='Board Members')
+    # User pengurus masjid (dari board_member_ids), tersimpan di tabel relasi ter-index.
+    # Dipakai ir.rule admin masjid sehingga filter akses tidak perlu join ke mosque.board.
+    manager_user_ids = fields.Many2many('res.users', 'mosque_manager_user_rel', 'mosque_id', 'user_id',
+                                        string='Managing Users', compute='_compute_manager_user_ids',
+                                        store=True, readonly=True)
     
     # # Relation to view all schedules in this mosque
     schedule_ids = fields.One2many('sermon.schedule', 'mosque_id', string='Sermon Schedules')
@@ -46,6 +69,142 @@ class Mosque(models.Model):
             parts = [record.street, record.area_id.name, record.zip_code, record.country_id.name]
             record.full_address = ', '.join(part for part in parts if part)
 
+    def write(self, vals):
+        res = super().write(vals)
+        # Link undangan WhatsApp yang tersimpan memuat nama masjid
+        if INVITATION_MOSQUE_FIELDS & vals.keys():
+            self.env['sermon.schedule']._invalidate_invitation_urls('mosque_id', self.ids)
+        return res
+
+    def init(self):
+        super().init()
+        # Index paginasi keyset /api/v1/mosques (ORDER BY name, id; name >= cursor)
+        tools.create_index(self.env.cr, 'mosque_mosque_name_id_idx', self._table, ['name', 'id'])
+
+    @api.depends('board_member_ids.user_id')
+    def _compute_manager_user_ids(self):
+        for record in self:
+            record.manager_user_ids = record.board_member_ids.user_id
+
+    @api.depends('latitude', 'longitude')
+    def _compute_geo_cell(self):
+        for record in self:
+            record.geo_cell = geo_cell(record.latitude, record.longitude)
+
+    @api.model
+    def _search_nearby(self, latitude, longitude, radius_km, limit=20):
+        """
+        Mengembalikan list (id, jarak_km) masjid dalam radius_km, urut dari yang terdekat.
+        Hanya sel grid di sekitar titik pusat yang dibaca (index geo_cell), bukan seluruh tabel.
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        candidates = self.search_read([
+            ('geo_cell', 'in', geo_cells_in_radius(latitude, longitude, radius_km)),
+            ('latitude', '>=', min_lat), ('latitude', '<=', max_lat),
+            ('longitude', '>=', min_lon), ('longitude', '<=', max_lon),
+        ], ['latitude', 'longitude'])
+        nearby = []
+        for candidate in candidates:
+            distance = haversine_km(latitude, longitude, candidate['latitude'], candidate['longitude'])
+            if distance <= radius_km:
+                nearby.append((candidate['id'], round(distance, 3)))
+        nearby.sort(key=lambda hit: hit[1])
+        return nearby[:limit]
+
+    def _recommendation_stamp(self):
+        """
+        Penanda versi data yang memengaruhi skor dasar rekomendasi masjid ini: baris masjid
+        sendiri, tabel pendakwah, dan jadwal terkonfirmasi/selesai di masjid ini (index
+        mosque_id), sehingga perubahan jadwal masjid lain tidak membuang cache masjid ini.
+        Perubahan area sudah membersihkan ormcache lewat masjida.api.cache.mixin.
+        """
+        self.ensure_one()
+        self.env['preacher.preacher'].flush_model(['write_date'])
+        self.env['sermon.schedule'].flush_model(['write_date', 'mosque_id', 'state'])
+        self.env.cr.execute(SQL(
+            """SELECT (SELECT max(write_date) FROM %s), (SELECT count(*) FROM %s),
+                      max(write_date), count(*)
+                 FROM %s WHERE mosque_id = %s AND state IN ('confirmed', 'done')""",
+            SQL.identifier(self.env['preacher.preacher']._table),
+            SQL.identifier(self.env['preacher.preacher']._table),
+            SQL.identifier(self.env['sermon.schedule']._table), self.id,
+        ))
+        return (self.sudo().write_date,) + tuple(self.env.cr.fetchone())
+
+    @api.model
+    @tools.ormcache('mosque_id', 'stamp')
+    def _get_preacher_base_scores(self, mosque_id, stamp):
+        """
+        Skor dasar setiap pendakwah untuk satu masjid: kedekatan area (hierarki parent_id
+        dan jarak koordinat area) serta jumlah ceramah terkonfirmasi/selesai di masjid ini.
+        Hasil di-cache per (masjid, stamp); stamp berubah saat data terkait berubah.
+        Mengembalikan tuple (preacher_id, specialization_id, skor) urut skor menurun.
+        """
+        mosque = self.sudo().browse(mosque_id)
+        areas = {area['id']: area for area in self.env['area.area'].sudo().search_read(
+            [], ['parent_id', 'latitude', 'longitude'])}
+
+        def lineage(area_id):
+            chain = []
+            while area_id and area_id not in chain:
+                chain.append(area_id)
+                parent = areas.get(area_id, {}).get('parent_id')
+                area_id = parent and parent[0]
+            return chain
+
+        mosque_lineage = lineage(mosque.area_id.id)
+        mosque_area = areas.get(mosque.area_id.id, {})
+        mosque_coords = ((mosque.latitude, mosque.longitude) if has_coordinates(mosque.latitude, mosque.longitude)
+                         else (mosque_area.get('latitude'), mosque_area.get('longitude')))
+
+        history = {preacher.id: count for preacher, count in self.env['sermon.schedule'].sudo()._read_group(
+            [('mosque_id', '=', mosque_id), ('state', 'in', ('confirmed', 'done'))],
+            ['preacher_id'], ['__count'],
+        )}
+
+        scores = []
+        for preacher in self.env['preacher.preacher'].sudo().search_read([], ['area_id', 'specialization_id']):
+            area_id = preacher['area_id'] and preacher['area_id'][0]
+            score = 0.0
+            if area_id and area_id == mosque.area_id.id:
+                score += RECOMMEND_SAME_AREA_SCORE
+            elif area_id and set(lineage(area_id)) & set(mosque_lineage):
+                # Area induk/anak atau satu induk dengan area masjid
+                score += RECOMMEND_RELATED_AREA_SCORE
+            area = areas.get(area_id)
+            if area and has_coordinates(area['latitude'], area['longitude']) and has_coordinates(*mosque_coords):
+                distance = haversine_km(mosque_coords[0], mosque_coords[1], area['latitude'], area['longitude'])
+                score += RECOMMEND_DISTANCE_SCORE * max(0.0, 1 - distance / RECOMMEND_DISTANCE_RANGE_KM)
+            score += RECOMMEND_HISTORY_SCORE * min(history.get(preacher['id'], 0), RECOMMEND_HISTORY_MAX_COUNT)
+            specialization_id = preacher['specialization_id'] and preacher['specialization_id'][0]
+            scores.append((preacher['id'], specialization_id, round(score, 2)))
+        scores.sort(key=lambda item: (-item[2], item[0]))
+        return tuple(scores)
+
+    def _get_recommended_preachers(self, specialization_id=None, start=None, end=None, limit=20):
+        """
+        List (preacher_id, skor) pendakwah yang direkomendasikan untuk masjid ini.
+        Skor dasar diambil dari cache; bonus spesialisasi dan filter ketersediaan
+        (jadwal aktif yang bentrok dengan [start, end)) dihitung per permintaan.
+        """
+        self.ensure_one()
+        base_scores = self._get_preacher_base_scores(self.id, self._recommendation_stamp())
+        busy_ids = self.env['sermon.schedule'].sudo()._get_busy_preacher_ids(start, end) if start else set()
+        ranked = []
+        for preacher_id, preacher_specialization_id, score in base_scores:
+            if preacher_id in busy_ids:
+                continue
+            if specialization_id and preacher_specialization_id == specialization_id:
+                score += RECOMMEND_SPECIALIZATION_SCORE
+            ranked.append((preacher_id, round(score, 2)))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    @api.depends('name', 'area_id.name')
+    def _compute_search_text(self):
+        for record in self:
+            record.search_text = normalize_search_text(record.name, record.area_id.name)
+
     # --- METODE BARU: Override name_get ---
     @api.depends('name', 'code', 'area_id.name')
     def _compute_display_name(self):
@@ -32,7 +32,7 @@ class MosqueBoard(models.Model):
     email = fields.Char(string='Email (for login)') 
 
     # Relasi ke masjid yang diurus
-    mosque_id = fields.Many2one('mosque.mosque', string='Mosque', required=True, ondelete='cascade')
+    mosque_id = fields.Many2one('mosque.mosque', string='Mosque', required=True, ondelete='cascade', index=True)
     
     # Relasi ke akun user Odoo untuk login
     user_id = fields.Many2one('res.users', string='User Account', ondelete='restrict', index=True,
@@ -66,39 +66,25 @@ class MosqueBoard(models.Model):
         if not admin_group or not user_group or not portal_group:
             raise ValidationError(_("One or more required user groups (Admin, Internal, Portal) not found."))
         
-        # Proses setiap vals
-        for vals in vals_list:
-            if not vals.get('user_id') and vals.get('email'):
-                user_vals = {
-                    'name': vals.get('name'),
-                    'login': vals.get('email'),
-                    'email': vals.get('email'),
-                    # Catatan: Password TIDAK diatur di sini. Odoo akan meminta Admin Odoo untuk mengaturnya 
-                    # atau pengguna baru harus menggunakan fitur reset password.
-                }
+        # Proses semua vals sekaligus: satu pencarian login, satu create user baru,
+        # dan satu penambahan grup per grup (TANPA portal) untuk seluruh batch.
+        to_provision = [vals for vals in vals_list if not vals.get('user_id') and vals.get('email')]
+        if to_provision:
+            users_by_login = self.env['res.users']._masjida_provision_users([{
+                'name': vals.get('name'),
+                'login': vals.get('email'),
+                'email': vals.get('email'),
+                # Catatan: Password TIDAK diatur di sini. Odoo akan meminta Admin Odoo untuk mengaturnya 
+                # atau pengguna baru harus menggunakan fitur reset password.
+            } for vals in to_provision], group_xmlids=('masjida.group_mosque_admin', 'base.group_user'))
+            for vals in to_provision:
+                vals['user_id'] = users_by_login[vals['email']].id
 
-                # Cari user yang sudah ada
-                user = self.env['res.users'].sudo().search([('login', '=', vals['email'])], limit=1)
-
-                if not user:
-                    # Buat user baru jika tidak ada
-                    user = self.env['res.users'].sudo().create(user_vals)
-
-                # Tambahkan grup yang diperlukan
-                # Tambahkan grup yang diperlukan (TANPA portal)
-                groups_to_add = []
-                if not user.has_group('masjida.group_mosque_admin'):
-                    groups_to_add.append(admin_group.id)
-                if not user.has_group('base.group_user'):
-                    groups_to_add.append(user_group.id)  # Internal User
-
-                if groups_to_add:
-                    user.write({'groups_id': [(4, gid) for gid in groups_to_add]})
-                    
-                vals['user_id'] = user.id
-            
         # Panggil super().create() untuk membuat record mosque.board
-        return super().create(vals_list)
+        records = super().create(vals_list)
+        # mosque.manager_user_ids dihitung ulang oleh ORM; domain ir.rule yang di-cache harus dibuang
+        self.env.registry.clear_cache()
+        return records
 
     def write(self, vals):
         """
@@ -118,7 +104,10 @@ class MosqueBoard(models.Model):
                 if user_vals:
                     record.user_id.sudo().write(user_vals)
                     
-        return super().write(vals)
+        res = super().write(vals)
+        if 'user_id' in vals or 'mosque_id' in vals:
+            self.env.registry.clear_cache()
+        return res
 
     def unlink(self):
         """
@@ -127,6 +116,7 @@ class MosqueBoard(models.Model):
         """
         users_to_unlink = self.mapped('user_id')
         res = super().unlink()
+        self.env.registry.clear_cache()
         
         # Hanya hapus user jika tidak ada record mosque.board lain 
         # (atau record preacher.preacher) yang menggunakannya.
@@ -2,10 +2,15 @@
 
 from odoo import models, fields, api
 
+from .search import normalize_search_text
+from .schedule import INVITATION_PREACHER_FIELDS
+
 class Preacher(models.Model):
     _name = 'preacher.preacher'
     _description = 'Preacher Master Data Model'
     _rec_name = "display_name"
+    _inherit = ['masjida.search.mixin', 'masjida.image.variant.mixin', 'masjida.sync.mixin',
+                'masjida.schedule.stats.mixin']
 
     
     code = fields.Char(string='code')
@@ -59,39 +64,48 @@ class Preacher(models.Model):
                 name += f" ({preacher.area_id.name})"
             preacher.display_name = name
 
-    @api.model
-    def create(self, vals):
+    @api.depends('name', 'specialization_id.name')
+    def _compute_search_text(self):
+        for preacher in self:
+            preacher.search_text = normalize_search_text(preacher.name, preacher.specialization_id.name)
+
+    @api.model_create_multi
+    def create(self, vals_list):
         """
         [DIUBAH]: Menggunakan logika Komposisi yang disederhanakan dan 
         memastikan user_id tidak bersifat unik.
+        Seluruh batch diproses sekaligus: satu pencarian login untuk semua email
+        dan satu create untuk semua user Portal baru.
         """
-        
-        user = None
-        if vals.get('email'):
-            # 1. Cari user yang sudah ada (tidak perlu cek user_id di vals karena ini Composition)
-            user = self.env['res.users'].sudo().search([('login', '=', vals['email'])], limit=1)
-            
-            # 2. Jika user tidak ada, buat user Portal baru.
-            if not user:
-                portal_group_id = self.env.ref('base.group_portal').id
-                user_vals = {
-                    'name': vals.get('name'),
-                    'login': vals.get('email'),
-                    'email': vals.get('email'),
-                    'groups_id': [(6, 0, [portal_group_id])] # Hanya grup Portal
-                }
-                user = self.env['res.users'].sudo().create(user_vals)
-                
+        to_provision = [vals for vals in vals_list if vals.get('email')]
+        if to_provision:
+            portal_group_id = self.env.ref('base.group_portal').id
+            # 1-2. Cari user yang sudah ada; buat user Portal baru untuk email yang belum terdaftar
+            users_by_login = self.env['res.users']._masjida_provision_users([{
+                'name': vals.get('name'),
+                'login': vals.get('email'),
+                'email': vals.get('email'),
+                'groups_id': [(6, 0, [portal_group_id])] # Hanya grup Portal
+            } for vals in to_provision])
             # 3. Tautkan user ke record ini
-            vals['user_id'] = user.id
+            for vals in to_provision:
+                vals['user_id'] = users_by_login[vals['email']].id
 
         # 4. Buat record preacher
-        preacher = super(Preacher, self).create(vals)
-        return preacher
+        return super().create(vals_list)
+
+    def write(self, vals):
+        res = super().write(vals)
+        # Link undangan WhatsApp yang tersimpan memuat nama, panggilan & nomor pendakwah
+        if INVITATION_PREACHER_FIELDS & vals.keys():
+            self.env['sermon.schedule']._invalidate_invitation_urls('preacher_id', self.ids)
+        return res
 
 class MasjidaHelpType(models.Model):
     _name = 'masjida.help.type'
     _description = 'Jenis Bantuan Masjida'
+    _inherit = ['masjida.api.cache.mixin']
+    _api_domain = [('active', '=', True)]
 
     name = fields.Char(string='Nama Bantuan', required=True)
     active = fields.Boolean(default=True)
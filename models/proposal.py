@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api
+from odoo.exceptions import UserError
 
 class SermonProposal(models.Model):
     _name = 'sermon.proposal'
@@ -29,41 +30,54 @@ class SermonProposal(models.Model):
         ('rejected', 'Rejected')     # Rejected by the mosque admin
     ], string='Status', default='draft', readonly=True)
 
+    def _check_board_member(self, message):
+        """
+        Memastikan user adalah Board Member dari SEMUA masjid pada proposal ini.
+        Satu query untuk seluruh recordset (bukan satu query per proposal).
+        """
+        mosques = self.mosque_id
+        managed = self.env['mosque.board'].search([('mosque_id', 'in', mosques.ids), ('user_id', '=', self.env.uid)])
+        if mosques - managed.mosque_id:
+            raise UserError(message)
+
     def action_submit(self):
-        """Function to send the proposal to the mosque admin."""
-        self.state = 'submitted'
-        # Notification logic for the mosque admin can be added here
+        """Function to send the proposal(s) to the mosque admin."""
+        self.write({'state': 'submitted'})
+        # Notifikasi ke pengurus masjid berjalan di antrian (cron worker)
+        self.env['masjida.job']._enqueue('notify_board', self)
 
     def action_approve(self):
-        """Function for the mosque admin to approve and create a new schedule."""
-        self.ensure_one()
-        
+        """Function for the mosque admin to approve proposals and create the new schedules."""
         # Validasi: Pastikan user adalah Board Member dari masjid terkait
-        is_board_member = self.env['mosque.board'].search_count([('mosque_id', '=', self.mosque_id.id),('user_id', '=', self.env.uid)])
-        if not is_board_member:
-            raise UserError('Only a board member of this mosque can approve the proposal.')
+        self._check_board_member('Only a board member of this mosque can approve the proposal.')
+
+        # Validasi: slot yang diusulkan tidak bentrok dengan jadwal aktif pendakwah/masjid
+        Schedule = self.env['sermon.schedule']
+        for proposal in self:
+            conflict = Schedule._find_conflict(proposal.preacher_id.id, proposal.mosque_id.id,
+                                               proposal.proposed_start_time, None)
+            if conflict:
+                raise UserError(f"Proposal '{proposal.proposed_topic}' overlaps with schedule '{conflict.topic}'.")
         
         # --- PERBAIKAN PENTING DI SINI ---
         # 1. Pastikan field mandatory Schedule terisi dari Proposal
-        schedule_vals = {
-            'mosque_id': self.mosque_id.id,            # DARI Proposal: mosque_id
-            'preacher_id': self.preacher_id.id,        # DARI Proposal: preacher_id
-            'topic': self.proposed_topic,              # DARI Proposal: proposed_topic
-            'start_time': self.proposed_start_time,    # DARI Proposal: proposed_start_time
+        schedule_vals_list = [{
+            'mosque_id': proposal.mosque_id.id,            # DARI Proposal: mosque_id
+            'preacher_id': proposal.preacher_id.id,        # DARI Proposal: preacher_id
+            'topic': proposal.proposed_topic,              # DARI Proposal: proposed_topic
+            'start_time': proposal.proposed_start_time,    # DARI Proposal: proposed_start_time
             # Field optional lainnya dapat ditambahkan di sini
             'state': 'draft' # Disarankan: Mulai dari 'draft', lalu Admin bisa Send Invitation
             # Jika Anda ingin langsung confirmed, gunakan 'confirmed', tapi 'draft' lebih baik
-        }
+        } for proposal in self]
         
-        # 2. Buat record di sermon.schedule
-        self.env['sermon.schedule'].create(schedule_vals)
+        # 2. Buat semua record sermon.schedule dalam satu create
+        self.env['sermon.schedule'].create(schedule_vals_list)
         
         # 3. Ubah status proposal
-        self.state = 'approved'
+        self.write({'state': 'approved'})
 
     def action_reject(self):
-        """Function for the mosque admin to reject the proposal."""
-        self.ensure_one()
-        if self.env.user not in self.mosque_id.board_member_ids:
-            raise models.UserError('Only this mosque\'s admin can reject the proposal.')
-        self.state = 'rejected'
\ No newline at end of file
+        """Function for the mosque admin to reject the proposal(s)."""
+        self._check_board_member('Only this mosque\'s admin can reject the proposal.')
+        self.write({'state': 'rejected'})
\ No newline at end of file
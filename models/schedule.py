@@ -1,20 +1,93 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+from datetime import datetime, time as dt_time, timedelta
+import csv
+import functools
+import io
+import logging
+import pytz
+import time
 import urllib.parse
 
+from .search import normalize_search_text
+
+_logger = logging.getLogger(__name__)
+
+# Cron _check_schedule_done: ukuran batch per commit dan batas waktu satu eksekusi (detik)
+SCHEDULE_DONE_BATCH_SIZE = 500
+SCHEDULE_DONE_TIME_BUDGET = 120
+
+# Jadwal pada state ini menempati waktu pendakwah/masjid dan tidak boleh bertabrakan
+SCHEDULE_BLOCKING_STATES = ('sent', 'confirmed')
+# Durasi yang diasumsikan jika end_time kosong
+DEFAULT_SCHEDULE_DURATION = timedelta(hours=1)
+# Jam lokal (SCHEDULE_TZ) yang dianggap tersedia untuk slot kosong pendakwah
+FREE_SLOT_DAY_START = dt_time(5, 0)
+FREE_SLOT_DAY_END = dt_time(22, 0)
+
+# Field yang memengaruhi isi undangan WhatsApp; invitation_url dikosongkan jika berubah
+INVITATION_FIELDS = {'topic', 'start_time', 'end_time', 'preacher_id', 'mosque_id'}
+# Field pendakwah/masjid yang ikut dipakai di undangan (lihat Preacher.write / Mosque.write)
+INVITATION_PREACHER_FIELDS = {'name', 'phone', 'gender'}
+INVITATION_MOSQUE_FIELDS = {'name'}
+
+# Template pesan undangan WhatsApp; di-encode sekali saat modul dimuat (lihat _get_whatsapp_invitation_urls)
+INVITATION_MESSAGE_TEMPLATE = """assalamualaikum {honorific} {preacher},
+Semoga {honorific} selalu dalam keadaan sehat wal 'afiat.
+saya pengurus Masjid {mosque} dengan hormat menawarkan untuk mengisi kegiatan di masjid kami. :
+
+Tema/Topik yang Diusulkan: {topic}
+Waktu yang Diajukan: {date}
+Pukul: {time_start} - {time_end} WIB
+
+Jika {honorific} berminat dan memiliki pertanyaan, mohon berikan balasan pada pesan ini.
+"""
+INVITATION_MESSAGE_ENCODED = urllib.parse.quote(INVITATION_MESSAGE_TEMPLATE, safe='{}_')
+INVITATION_HONORIFICS = {'male': 'Ustaz', 'female': 'Ustazah'}
+INVITATION_DAY_NAMES = ('Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu')
+INVITATION_MONTH_NAMES = ('Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli',
+                          'Agustus', 'September', 'Oktober', 'November', 'Desember')
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_phone(phone):
+    """Membersihkan nomor dari spasi/strip dan memastikan format internasional (62...)."""
+    phone_number = ''.join(filter(str.isdigit, phone))
+    if phone_number.startswith('0'):
+        phone_number = '62' + phone_number[1:]
+    elif not phone_number.startswith('62') and len(phone_number) > 5:
+        # Asumsi, jika tidak diawali 0 atau 62, tambahkan 62 (ini perlu disesuaikan dengan standar Anda)
+        phone_number = '62' + phone_number
+    return phone_number
+
+
+# Zona waktu lokal jadwal (WIB). Hari & jam lokal disimpan agar filter API bisa di SQL.
+SCHEDULE_TZ = 'Asia/Jakarta'
+
 class SermonSchedule(models.Model):
     _name = 'sermon.schedule'
     _description = 'Sermon Schedule at a Mosque by a Preacher'
     _rec_name = 'topic'
+    _inherit = ['masjida.search.mixin', 'masjida.sync.mixin']
 
-    mosque_id = fields.Many2one('mosque.mosque', string='Mosque', required=True, ondelete='cascade')
-    preacher_id = fields.Many2one('preacher.preacher', string='Preacher', required=True, ondelete='cascade')
+    mosque_id = fields.Many2one('mosque.mosque', string='Mosque', required=True, ondelete='cascade', index=True)
+    preacher_id = fields.Many2one('preacher.preacher', string='Preacher', required=True, ondelete='cascade', index=True)
     
     topic = fields.Char(string='Sermon Topic/Theme', required=True)
     description = fields.Text(string='Brief Description')
     start_time = fields.Datetime(string='Start Time', required=True)
     end_time = fields.Datetime(string='End Time')
+    # end_time, atau start_time + DEFAULT_SCHEDULE_DURATION jika end_time kosong/tidak valid
+    # (selalu > start_time agar tsrange tidak error); dipakai untuk deteksi bentrok
+    effective_end_time = fields.Datetime(string='Effective End Time', compute='_compute_effective_end_time',
+                                         store=True)
+
+    # Hari (0=Senin ... 6=Minggu) dan menit-sejak-tengah-malam dari start_time dalam SCHEDULE_TZ
+    start_weekday = fields.Integer(string='Local Weekday', compute='_compute_local_start', store=True)
+    start_minute = fields.Integer(string='Local Start Minute', compute='_compute_local_start', store=True)
     
     state = fields.Selection([
         ('draft', 'Draft'),                 # Created by mosque admin
@@ -25,95 +98,342 @@ class SermonSchedule(models.Model):
         ('cancelled', 'Cancelled')          # Cancelled by either party
     ], string='Status', default='draft', readonly=True, copy=False)
 
+    # Link undangan WhatsApp yang dirender oleh job antrian (masjida.job 'render_invitation')
+    invitation_url = fields.Char(string='Invitation URL', readonly=True, copy=False)
+
+    def init(self):
+        super().init()
+        # Index untuk filter jadwal publik: state + hari lokal, diurutkan start_time
+        tools.create_index(self.env.cr, 'sermon_schedule_state_weekday_start_idx',
+                           self._table, ['state', 'start_weekday', 'start_time'])
+        # Index untuk cron _check_schedule_done (end_time, atau start_time jika end_time kosong)
+        tools.create_index(self.env.cr, 'sermon_schedule_state_end_time_idx',
+                           self._table, ['state', 'end_time'])
+        tools.create_index(self.env.cr, 'sermon_schedule_state_start_no_end_idx',
+                           self._table, ['state', 'start_time'], where='end_time IS NULL')
+        # Index GiST rentang waktu untuk deteksi bentrok (operator &&) tanpa scan seluruh tabel
+        tools.create_index(self.env.cr, 'sermon_schedule_time_range_idx',
+                           self._table, ['tsrange(start_time, effective_end_time)'], method='gist',
+                           where=f"state IN {SCHEDULE_BLOCKING_STATES}")
+
+    @api.depends('start_time', 'end_time')
+    def _compute_effective_end_time(self):
+        for rec in self:
+            if rec.end_time and rec.start_time and rec.end_time > rec.start_time:
+                rec.effective_end_time = rec.end_time
+            elif rec.start_time:
+                rec.effective_end_time = rec.start_time + DEFAULT_SCHEDULE_DURATION
+            else:
+                rec.effective_end_time = False
+
+    @api.constrains('start_time', 'end_time')
+    def _check_end_time(self):
+        for rec in self:
+            if rec.end_time and rec.end_time <= rec.start_time:
+                raise ValidationError(_("End time must be after start time."))
+
+    @api.constrains('start_time', 'end_time', 'preacher_id', 'mosque_id', 'state')
+    def _check_schedule_conflict(self):
+        """
+        Jadwal aktif tidak boleh bertabrakan untuk pendakwah yang sama atau masjid yang sama.
+        Catatan: ini pemeriksaan lalu tulis tanpa lock; dua transaksi bersamaan yang
+        mengonfirmasi jadwal bentrok masih bisa sama-sama lolos.
+        """
+        for rec in self:
+            if rec.state not in SCHEDULE_BLOCKING_STATES:
+                continue
+            conflict = self._find_conflict(rec.preacher_id.id, rec.mosque_id.id,
+                                           rec.start_time, rec.effective_end_time, exclude_id=rec.id)
+            if conflict:
+                raise ValidationError(_("Schedule '%(topic)s' overlaps with '%(other)s'.",
+                                        topic=rec.topic, other=conflict.topic))
+
+    @api.model
+    def _find_conflict(self, preacher_id, mosque_id, start, end, exclude_id=None):
+        """
+        Mencari satu jadwal aktif yang waktunya beririsan dengan [start, end) untuk
+        pendakwah atau masjid yang sama. Query rentang memakai index GiST.
+        """
+        end = end or start + DEFAULT_SCHEDULE_DURATION
+        self.flush_model(['preacher_id', 'mosque_id', 'state', 'start_time', 'effective_end_time'])
+        self.env.cr.execute(SQL(
+            """SELECT id FROM %s
+                WHERE state IN %s AND id != %s AND (preacher_id = %s OR mosque_id = %s)
+                  AND tsrange(start_time, effective_end_time) && tsrange(%s, %s)
+                LIMIT 1""",
+            SQL.identifier(self._table), SCHEDULE_BLOCKING_STATES, exclude_id or 0,
+            preacher_id or 0, mosque_id or 0, start, end,
+        ))
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+
+    @api.model
+    def _get_busy_preacher_ids(self, start, end):
+        """Set id pendakwah yang memiliki jadwal aktif beririsan dengan [start, end)."""
+        self.flush_model(['preacher_id', 'state', 'start_time', 'effective_end_time'])
+        self.env.cr.execute(SQL(
+            """SELECT DISTINCT preacher_id FROM %s
+                WHERE state IN %s AND tsrange(start_time, effective_end_time) && tsrange(%s, %s)""",
+            SQL.identifier(self._table), SCHEDULE_BLOCKING_STATES, start, end,
+        ))
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _get_busy_intervals(self, preacher_id, start, end, states=SCHEDULE_BLOCKING_STATES):
+        """List (start, end) jadwal pendakwah berstatus states yang beririsan dengan [start, end), urut waktu."""
+        self.flush_model(['preacher_id', 'state', 'start_time', 'effective_end_time'])
+        self.env.cr.execute(SQL(
+            """SELECT start_time, effective_end_time FROM %s
+                WHERE state IN %s AND preacher_id = %s
+                  AND tsrange(start_time, effective_end_time) && tsrange(%s, %s)
+                ORDER BY start_time""",
+            SQL.identifier(self._table), tuple(states), preacher_id, start, end,
+        ))
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _get_free_slots(self, preacher_id, start, end, min_duration=DEFAULT_SCHEDULE_DURATION,
+                        busy_states=SCHEDULE_BLOCKING_STATES):
+        """
+        Slot kosong pendakwah antara start dan end (datetime UTC naive), dibatasi jam
+        FREE_SLOT_DAY_START..FREE_SLOT_DAY_END waktu lokal setiap hari. Slot lebih pendek
+        dari min_duration diabaikan. busy_states: status jadwal yang dianggap sibuk.
+        """
+        tz = pytz.timezone(SCHEDULE_TZ)
+        busy = self._get_busy_intervals(preacher_id, start, end, busy_states)
+        slots = []
+        day = pytz.utc.localize(start).astimezone(tz).date()
+        last_day = pytz.utc.localize(end).astimezone(tz).date()
+        while day <= last_day:
+            window_start = tz.localize(datetime.combine(day, FREE_SLOT_DAY_START)).astimezone(pytz.utc).replace(tzinfo=None)
+            window_end = tz.localize(datetime.combine(day, FREE_SLOT_DAY_END)).astimezone(pytz.utc).replace(tzinfo=None)
+            cursor, window_end = max(window_start, start), min(window_end, end)
+            for busy_start, busy_end in busy:
+                if busy_end <= cursor or busy_start >= window_end:
+                    continue
+                if busy_start - cursor >= min_duration:
+                    slots.append((cursor, busy_start))
+                cursor = max(cursor, busy_end)
+            if window_end - cursor >= min_duration:
+                slots.append((cursor, window_end))
+            day += timedelta(days=1)
+        return slots
+
+    @api.depends('start_time')
+    def _compute_local_start(self):
+        """Menghitung hari dan menit mulai dalam waktu lokal (SCHEDULE_TZ)."""
+        tz = pytz.timezone(SCHEDULE_TZ)
+        for rec in self:
+            if rec.start_time:
+                local_start = pytz.utc.localize(rec.start_time).astimezone(tz)
+                rec.start_weekday = local_start.weekday()
+                rec.start_minute = local_start.hour * 60 + local_start.minute
+            else:
+                rec.start_weekday = False
+                rec.start_minute = False
+
+    @api.depends('topic', 'preacher_id.name')
+    def _compute_search_text(self):
+        for rec in self:
+            rec.search_text = normalize_search_text(rec.topic, rec.preacher_id.name)
+
+    @api.model
+    def _search_public_domain(self):
+        # Sama dengan /api/v1/schedules/public: hanya jadwal confirmed yang akan datang
+        return [('state', '=', 'confirmed'), ('start_time', '>=', fields.Datetime.now())]
+
+    def write(self, vals):
+        if INVITATION_FIELDS & vals.keys():
+            vals = dict(vals, invitation_url=False)
+        return super().write(vals)
+
+    @api.model
+    def _invalidate_invitation_urls(self, field_name, record_ids):
+        """Mengosongkan invitation_url jadwal milik pendakwah/masjid yang datanya berubah."""
+        self.sudo().search([(field_name, 'in', record_ids), ('invitation_url', '!=', False)]).write(
+            {'invitation_url': False})
+
     def action_send_invitation(self):
         """Function called by the mosque admin to send the invitation."""
-        for rec in self:
-            # Logic to send notifications/emails to the preacher can be added here
-            rec.state = 'sent'
+        self.write({'state': 'sent'})
+        # Notifikasi ke pendakwah dan render undangan berjalan di antrian (cron worker)
+        Job = self.env['masjida.job']
+        Job._enqueue('notify_preacher', self)
+        Job._enqueue('render_invitation', self)
             
     def action_confirm(self):
-        """Function called by the preacher to accept the invitation."""
-        self.ensure_one()
-        self.state = 'confirmed'
+        """Function called by the preacher to accept the invitation(s)."""
+        self.write({'state': 'confirmed'})
         
     def action_reject(self):
-        """Function called by the preacher to reject the invitation."""
-        self.ensure_one()
-        self.state = 'rejected'
+        """Function called by the preacher to reject the invitation(s)."""
+        self.write({'state': 'rejected'})
 
     def action_cancel(self):
         """Function to cancel a confirmed schedule."""
         self.state = 'cancelled'
 
     def action_open_whatsapp_invitation(self):
+        """
+        Membuka URL WhatsApp untuk mengirim undangan awal kepada Pendakwah.
+        Memakai link yang sudah dirender oleh antrian job jika tersedia.
+        """
+        self.ensure_one()
+        # Kembalikan action untuk membuka link di browser baru
+        return {
+            'type': 'ir.actions.act_url',
+            'url': self.invitation_url or self._get_whatsapp_invitation_url(),
+            'target': 'new', 
+        }
+
+    def _get_whatsapp_invitation_url(self):
         """
         Menghasilkan URL WhatsApp untuk mengirim undangan awal kepada Pendakwah.
         """
         self.ensure_one()
-        
-        preacher = self.preacher_id
-        mosque = self.mosque_id
-        
-        # 1. Validasi dan Pembersihan Nomor Telepon
-        if not preacher.phone:
+        url = self._get_whatsapp_invitation_urls()[self.id]
+        # 1. Validasi Nomor Telepon
+        if not url:
             raise models.UserError("Nomor telepon Pendakwah belum diisi pada profilnya.")
+        return url
 
-        # Bersihkan nomor dari spasi/strip dan pastikan format internasional (62...)
-        phone_number = ''.join(filter(str.isdigit, preacher.phone))
-        if phone_number.startswith('0'):
-            phone_number = '62' + phone_number[1:]
-        elif not phone_number.startswith('62') and len(phone_number) > 5:
-             # Asumsi, jika tidak diawali 0 atau 62, tambahkan 62 (ini perlu disesuaikan dengan standar Anda)
-             phone_number = '62' + phone_number
-
-        # 2. Penentuan Panggilan Hormat (Honorific)
-        honorific = 'Ustaz'
-        if preacher.gender == 'female':
-            honorific = 'Ustazah'
-        elif preacher.gender != 'male':
-            # Jika gender tidak terdefinisi/tidak jelas
-            honorific = 'Ustaz/Ustazah'
-
-        # 3. Format Tanggal & Waktu
-        # Mengambil objek datetime yang sudah disesuaikan dengan timezone pengguna Odoo
-        start_dt = fields.Datetime.context_timestamp(self, self.start_time)
-        end_dt = fields.context_timestamp(self, self.end_time) if self.end_time else None
-        
-        # Menggunakan strftime, dengan asumsi locale Odoo sudah dikonfigurasi untuk Indonesia
-        # Jika locale belum diatur, perlu penanganan manual (lihat catatan di bawah)
-        # Format: Senin, 19 November 2025
-        formatted_date = start_dt.strftime("%A, %d %B %Y")
-        
-        formatted_time_start = start_dt.strftime("%H:%M")
-        formatted_time_end = end_dt.strftime("%H:%M") if end_dt else 'Selesai'
+    def _get_whatsapp_invitation_urls(self):
+        """
+        Merender URL undangan WhatsApp untuk seluruh recordset sekaligus.
+        Template pesan sudah di-encode saat modul dimuat; per jadwal hanya nilai
+        (nama, topik, tanggal) yang di-encode. Nomor telepon dan panggilan hormat
+        dihitung sekali per pendakwah. Mengembalikan dict id -> url (None jika
+        pendakwah belum memiliki nomor telepon).
+        """
+        quote = urllib.parse.quote
+        tz = pytz.timezone(SCHEDULE_TZ)
+        preacher_parts = {}
+        mosque_names = {}
+        urls = {}
+        for schedule in self:
+            preacher = schedule.preacher_id
+            if preacher.id not in preacher_parts:
+                # 2. Nomor telepon (format internasional) & Panggilan Hormat (Honorific), per pendakwah
+                phone_number = _normalize_phone(preacher.phone) if preacher.phone else None
+                honorific = INVITATION_HONORIFICS.get(preacher.gender, 'Ustaz/Ustazah')
+                preacher_parts[preacher.id] = (phone_number, quote(honorific), quote(preacher.name or ''))
+            phone_number, honorific, preacher_name = preacher_parts[preacher.id]
+            if not phone_number:
+                urls[schedule.id] = None
+                continue
+            if schedule.mosque_id.id not in mosque_names:
+                mosque_names[schedule.mosque_id.id] = quote(schedule.mosque_id.name or '')
 
-        # 4. Susun Pesan (menggunakan f-string untuk keterbacaan)
-        message = f"""assalamualaikum {honorific} {preacher.name},
-Semoga {honorific} selalu dalam keadaan sehat wal 'afiat.
-saya pengurus Masjid {mosque.name} dengan hormat menawarkan untuk mengisi kegiatan di masjid kami. :
+            # 3. Format Tanggal & Waktu (selalu SCHEDULE_TZ/WIB, tidak bergantung pada user yang
+            #    merender, misal user cron; nama hari/bulan Indonesia)
+            start_dt = pytz.utc.localize(schedule.start_time).astimezone(tz)
+            end_dt = pytz.utc.localize(schedule.end_time).astimezone(tz) if schedule.end_time else None
+            # Format: Senin, 19 November 2025
+            formatted_date = (f"{INVITATION_DAY_NAMES[start_dt.weekday()]}, {start_dt.day:02d} "
+                              f"{INVITATION_MONTH_NAMES[start_dt.month - 1]} {start_dt.year}")
 
-Tema/Topik yang Diusulkan: {self.topic}
-Waktu yang Diajukan: {formatted_date}
-Pukul: {formatted_time_start} - {formatted_time_end} WIB
+            # 4-5. Isi template yang sudah di-encode
+            encoded_message = INVITATION_MESSAGE_ENCODED.format(
+                honorific=honorific,
+                preacher=preacher_name,
+                mosque=mosque_names[schedule.mosque_id.id],
+                topic=quote(schedule.topic or ''),
+                date=quote(formatted_date),
+                time_start=start_dt.strftime("%H%%3A%M"),
+                time_end=end_dt.strftime("%H%%3A%M") if end_dt else 'Selesai',
+            )
+            # 6. Buat Link WhatsApp
+            urls[schedule.id] = f"https://wa.me/{phone_number}?text={encoded_message}"
+        return urls
 
-Jika {honorific} berminat dan memiliki pertanyaan, mohon berikan balasan pada pesan ini.
-"""
-        
-        # 5. URL Encode Pesan
-        encoded_message = urllib.parse.quote(message)
-        
-        # 6. Buat Link WhatsApp
-        whatsapp_url = f"https://wa.me/{phone_number}?text={encoded_message}"
-        
-        # 7. Kembalikan action untuk membuka link di browser baru
+    @api.model
+    def _store_invitation_urls(self, urls):
+        """
+        Menyimpan dict id -> url ke invitation_url dengan satu UPDATE (tanpa override write
+        per jadwal). invitation_url hanya cache link, sehingga write_date tidak diubah.
+        """
+        values = [SQL("(%s, %s)", schedule_id, url) for schedule_id, url in urls.items() if url]
+        if not values:
+            return
+        self.flush_model(['invitation_url'])
+        self.env.cr.execute(SQL(
+            "UPDATE %s AS s SET invitation_url = v.url FROM (VALUES %s) AS v(id, url) WHERE s.id = v.id",
+            SQL.identifier(self._table), SQL(", ").join(values),
+        ))
+        self.browse(list(urls)).invalidate_recordset(['invitation_url'])
+
+    def action_generate_whatsapp_invitations(self):
+        """
+        Mode batch: merender undangan WhatsApp untuk semua jadwal terpilih dalam satu aksi
+        dan mengembalikan file CSV (topik, pendakwah, masjid, waktu, link) untuk diunduh.
+        Link yang sudah dirender sebelumnya (invitation_url) dipakai ulang.
+        """
+        missing = self.filtered(lambda schedule: not schedule.invitation_url)
+        self._store_invitation_urls(missing._get_whatsapp_invitation_urls())
+
+        tz = pytz.timezone(SCHEDULE_TZ)
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['topic', 'preacher', 'mosque', 'start_time', 'whatsapp_url'])
+        for schedule in self.sorted('start_time'):
+            writer.writerow([
+                schedule.topic, schedule.preacher_id.name, schedule.mosque_id.name,
+                pytz.utc.localize(schedule.start_time).astimezone(tz).strftime('%Y-%m-%d %H:%M'),
+                schedule.invitation_url or 'Nomor telepon Pendakwah belum diisi',
+            ])
+        # File CSV dilampirkan ke user yang mengunduh; file sebelumnya milik user tersebut
+        # dihapus sehingga filestore hanya menyimpan satu file per user.
+        Attachment = self.env['ir.attachment']
+        Attachment.search([
+            ('res_model', '=', 'res.users'), ('res_id', '=', self.env.uid),
+            ('name', '=like', 'undangan_whatsapp_%.csv'),
+        ]).unlink()
+        attachment = Attachment.create({
+            'name': f'undangan_whatsapp_{fields.Date.today()}.csv',
+            'raw': output.getvalue().encode(),
+            'mimetype': 'text/csv',
+            'res_model': 'res.users',
+            'res_id': self.env.uid,
+        })
         return {
             'type': 'ir.actions.act_url',
-            'url': whatsapp_url,
-            'target': 'new', 
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
         }
 
     @api.model
-    def _check_schedule_done(self):
-        """Scheduler function to automatically set the state to 'Done'."""
-        schedules = self.search([('state', '=', 'confirmed'), ('end_time', '<', fields.Datetime.now())])
-        schedules.write({'state': 'done'})
+    def _check_schedule_done(self, batch_size=SCHEDULE_DONE_BATCH_SIZE, auto_commit=False):
+        """
+        Scheduler function to automatically set the state to 'Done'.
+        Jadwal dianggap selesai jika end_time sudah lewat, atau start_time jika end_time kosong.
+        Diproses per batch; dengan auto_commit setiap batch di-commit sehingga eksekusi
+        yang terhenti (time limit cron) akan melanjutkan sisa jadwal pada eksekusi berikutnya.
+        """
+        now = fields.Datetime.now()
+        domain = [
+            ('state', '=', 'confirmed'),
+            '|',
+            ('end_time', '<', now),
+            '&', ('end_time', '=', False), ('start_time', '<', now),
+        ]
+        started = time.monotonic()
+        done = 0
+        while True:
+            schedules = self.search(domain, limit=batch_size, order='id')
+            if not schedules:
+                break
+            schedules.write({'state': 'done'})
+            done += len(schedules)
+            if auto_commit:
+                self.env.cr.commit()
+            _logger.info("_check_schedule_done: %s schedule(s) set to done", done)
+            if len(schedules) < batch_size:
+                break
+            if time.monotonic() - started > SCHEDULE_DONE_TIME_BUDGET:
+                # Sisa jadwal diproses oleh eksekusi cron berikutnya (dijadwalkan segera)
+                _logger.info("_check_schedule_done: time budget reached, rescheduling cron")
+                cron = self.env.ref('masjida.ir_cron_sermon_schedule_done', raise_if_not_found=False)
+                if cron:
+                    cron._trigger()
+                break
+        return done
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+
+class MasjidaScheduleStatsMixin(models.AbstractModel):
+    """
+    Agregat jadwal tersimpan untuk model yang memiliki One2many 'schedule_ids'
+    ke sermon.schedule (masjid dan pendakwah). Dihitung ulang hanya untuk record
+    yang jadwalnya berubah state/waktu, dengan satu query agregat per batch.
+    """
+    _name = 'masjida.schedule.stats.mixin'
+    _description = 'Masjida Schedule Aggregates Mixin'
+
+    upcoming_sermon_count = fields.Integer(string='Upcoming Sermons', compute='_compute_schedule_stats',
+                                           store=True, help="Number of confirmed (not yet done) schedules.")
+    next_sermon_at = fields.Datetime(string='Next Sermon At', compute='_compute_schedule_stats', store=True)
+    sermons_delivered_count = fields.Integer(string='Sermons Delivered', compute='_compute_schedule_stats',
+                                             store=True, help="Number of schedules marked as done.")
+
+    @api.depends('schedule_ids.state', 'schedule_ids.start_time')
+    def _compute_schedule_stats(self):
+        inverse_name = self._fields['schedule_ids'].inverse_name
+        stats = {}
+        if self._origin.ids:
+            groups = self.env['sermon.schedule'].sudo()._read_group(
+                [(inverse_name, 'in', self._origin.ids), ('state', 'in', ('confirmed', 'done'))],
+                [inverse_name, 'state'],
+                ['__count', 'start_time:min'],
+            )
+            for parent, state, count, first_start in groups:
+                stats[(parent.id, state)] = (count, first_start)
+        for record in self:
+            upcoming_count, next_start = stats.get((record._origin.id, 'confirmed'), (0, False))
+            record.upcoming_sermon_count = upcoming_count
+            record.next_sermon_at = next_start
+            record.sermons_delivered_count = stats.get((record._origin.id, 'done'), (0, False))[0]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+import re
+
+
+def normalize_search_text(*parts):
+    """Menggabungkan beberapa teks menjadi satu string huruf kecil dengan spasi tunggal."""
+    text = ' '.join(part for part in parts if part)
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+class MasjidaSearchMixin(models.AbstractModel):
+    """
+    Mixin pencarian: menyimpan teks pencarian ternormalisasi (search_text) dengan
+    index trigram (GIN pg_trgm) agar pencarian 'ilike' tidak melakukan sequential scan.
+    Model turunan wajib meng-override _compute_search_text beserta @api.depends-nya.
+    Jika ekstensi pg_trgm tidak terpasang di database, Odoo memakai index biasa dan
+    peringkat hasil dihitung secara sederhana (lihat _search_ranked).
+    """
+    _name = 'masjida.search.mixin'
+    _description = 'Masjida Search Mixin'
+
+    search_text = fields.Char(string='Search Text', compute='_compute_search_text',
+                              store=True, index='trigram', readonly=True)
+
+    def _compute_search_text(self):
+        for record in self:
+            record.search_text = normalize_search_text(record.display_name)
+
+    @api.model
+    def _search_public_domain(self):
+        """Domain tambahan yang membatasi hasil /api/v1/search untuk model ini."""
+        return []
+
+    @api.model
+    def _search_ranked(self, query, limit=10):
+        """
+        Mengembalikan list (id, score) yang cocok dengan 'query', diurutkan dari skor
+        tertinggi. Skor adalah similarity() trigram (0..1) jika pg_trgm tersedia.
+        """
+        term = normalize_search_text(query)
+        if not term:
+            return []
+        domain = self._search_public_domain() + [('search_text', 'ilike', term)]
+        if not self.env.registry.has_trigram:
+            rows = self.search_read(domain, ['search_text'], limit=limit, order='id')
+            ranked = [(row['id'], 1.0 if row['search_text'].startswith(term) else 0.5) for row in rows]
+            return sorted(ranked, key=lambda hit: -hit[1])
+
+        # _search() menerapkan ir.rule, lalu urutkan berdasarkan similarity di SQL
+        score = SQL("similarity(%s, %s)", SQL.identifier(self._table, 'search_text'), term)
+        search_query = self._search(domain)
+        search_query.order = SQL("%s DESC, %s", score, SQL.identifier(self._table, 'id'))
+        search_query.limit = limit
+        self.env.cr.execute(search_query.select(SQL.identifier(self._table, 'id'), score))
+        return [(record_id, round(rank, 4)) for record_id, rank in self.env.cr.fetchall()]
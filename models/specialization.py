@@ -4,6 +4,7 @@ from odoo import models, fields
 class PreacherSpecialization(models.Model):
     _name = 'preacher.specialization'
     _description = 'Preacher Specialization'
+    _inherit = ['masjida.api.cache.mixin', 'masjida.sync.mixin']
     _order = 'name'
 
     name = fields.Char(string='Specialization Name', required=True)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Tombstone lebih tua dari ini dihapus; klien dengan token lebih lama harus sync penuh
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+
+class MasjidaSyncTombstone(models.Model):
+    """Catatan id record yang dihapus, untuk endpoint /api/v1/sync."""
+    _name = 'masjida.sync.tombstone'
+    _description = 'Deleted Record Log for Mobile Sync'
+    _order = 'id'
+    _log_access = False
+
+    model = fields.Char(string='Model', required=True, index=True)
+    res_id = fields.Integer(string='Record ID', required=True)
+    deleted_at = fields.Datetime(string='Deleted At', required=True, index=True,
+                                 default=fields.Datetime.now)
+
+    @api.model
+    def _gc_tombstones(self):
+        """Menghapus tombstone yang melewati masa simpan."""
+        limit_date = fields.Datetime.now() - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
+        tombstones = self.sudo().search([('deleted_at', '<', limit_date)])
+        tombstones.unlink()
+        _logger.info("_gc_tombstones: %s tombstone(s) removed", len(tombstones))
+
+
+class MasjidaSyncMixin(models.AbstractModel):
+    """
+    Mixin untuk model yang disinkronkan ke aplikasi mobile secara delta:
+    index pada write_date (record berubah) dan tombstone saat unlink (record dihapus).
+    Catatan: record yang terhapus oleh ON DELETE CASCADE di database (misal jadwal
+    milik masjid yang dihapus) tidak melewati unlink(); klien menghapusnya bersama induknya.
+    """
+    _name = 'masjida.sync.mixin'
+    _description = 'Masjida Mobile Sync Mixin'
+
+    def init(self):
+        super().init()
+        if not self._abstract:
+            tools.create_index(self.env.cr, f'{self._table}_write_date_idx', self._table, ['write_date'])
+
+    def unlink(self):
+        tombstones = [{'model': self._name, 'res_id': record_id} for record_id in self.ids]
+        res = super().unlink()
+        self.env['masjida.sync.tombstone'].sudo().create(tombstones)
+        return res
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import config, SQL
+from datetime import timedelta
+from psycopg2.errors import LockNotAvailable
+import hashlib
+import logging
+import os
+import uuid
+
+_logger = logging.getLogger(__name__)
+
+# Batas ukuran satu file upload dan ukuran blok saat menyalin stream request ke disk
+MAX_UPLOAD_SIZE = 25 * 1024 * 1024
+UPLOAD_BLOCK_SIZE = 64 * 1024
+# Sesi upload yang tidak selesai/tidak dipakai dihapus setelah sekian jam
+UPLOAD_EXPIRY_HOURS = 24
+
+
+class MasjidaUpload(models.Model):
+    """
+    Sesi upload bertahap (chunked & resumable) dari aplikasi mobile.
+    Potongan file ditulis langsung ke file sementara di filestore (tanpa base64,
+    tanpa memuat seluruh file di memori). Jika koneksi putus, klien menanyakan
+    received_size lalu melanjutkan dari offset tersebut. Setelah lengkap, file
+    dipindahkan ke ir.attachment dan token dapat dipakai oleh endpoint proposal/profil.
+    """
+    _name = 'masjida.upload'
+    _description = 'Chunked Upload Session'
+    _order = 'create_date desc'
+
+    token = fields.Char(string='Token', required=True, index=True, copy=False, readonly=True,
+                        default=lambda self: uuid.uuid4().hex)
+    user_id = fields.Many2one('res.users', string='Uploaded By', required=True, index=True,
+                              ondelete='cascade', default=lambda self: self.env.user)
+    filename = fields.Char(string='File Name')
+    mimetype = fields.Char(string='Mime Type')
+    size = fields.Integer(string='Size (bytes)', required=True)
+    received_size = fields.Integer(string='Received (bytes)', default=0, readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Attachment', ondelete='set null', readonly=True)
+    state = fields.Selection([
+        ('open', 'Uploading'),      # Potongan masih dikirim
+        ('done', 'Completed'),      # File lengkap, token siap dipakai
+        ('used', 'Used'),           # Token sudah dipakai oleh proposal/profil
+    ], string='Status', default='open', readonly=True)
+
+    _sql_constraints = [
+        ('token_uniq', 'unique(token)', 'Upload token must be unique!'),
+    ]
+
+    @api.constrains('size')
+    def _check_size(self):
+        for upload in self:
+            if upload.size <= 0 or upload.size > MAX_UPLOAD_SIZE:
+                raise ValidationError(_("Upload size must be between 1 byte and %s bytes.", MAX_UPLOAD_SIZE))
+
+    def _part_path(self):
+        """Lokasi file sementara upload ini di filestore database."""
+        self.ensure_one()
+        directory = os.path.join(config.filestore(self.env.cr.dbname), 'masjida_uploads')
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f'{self.token}.part')
+
+    def _get_received_size(self, update=True):
+        """
+        Jumlah byte yang benar-benar sudah diterima. Selama upload terbuka, ukuran file
+        sementara adalah sumber kebenaran: jika koneksi putus di tengah potongan,
+        byte yang sudah tertulis tetap ada walaupun received_size belum tersimpan.
+        update=False hanya membaca (tanpa write), misal saat baris dikunci request lain.
+        """
+        self.ensure_one()
+        if self.state != 'open':
+            return self.received_size
+        path = self._part_path()
+        received = os.path.getsize(path) if os.path.exists(path) else 0
+        if update and received != self.received_size:
+            self.write({'received_size': received})
+        return received
+
+    def _lock_for_append(self):
+        """
+        Mengunci baris upload (FOR UPDATE NOWAIT) selama potongan ditulis, sehingga dua
+        request untuk offset yang sama (misal retry saat request pertama masih streaming)
+        tidak menulis ke file sementara secara bersamaan. UserError jika sedang dikunci.
+        """
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(SQL("SELECT id FROM %s WHERE id = %s FOR UPDATE NOWAIT",
+                                        SQL.identifier(self._table), self.id))
+        except LockNotAvailable:
+            raise UserError(_("Another chunk of this upload is still being received."))
+        # Baca ulang state/received_size yang mungkin diubah request sebelumnya
+        self.invalidate_recordset()
+
+    def _append_chunk(self, stream, offset):
+        """
+        Menyalin stream (request body) ke file sementara mulai dari 'offset'.
+        offset harus sama dengan jumlah byte yang sudah diterima, sehingga potongan
+        yang terkirim ulang setelah koneksi putus tidak tertulis dua kali.
+        """
+        self.ensure_one()
+        self._lock_for_append()
+        if self.state != 'open':
+            raise UserError(_("This upload is already completed."))
+        path = self._part_path()
+        received = self._get_received_size()
+        if offset != received:
+            raise ValidationError(_("Invalid offset %(offset)s, expected %(received)s.", offset=offset, received=received))
+
+        try:
+            with open(path, 'ab') as part:
+                while True:
+                    block = stream.read(UPLOAD_BLOCK_SIZE)
+                    if not block:
+                        break
+                    if received + len(block) > self.size:
+                        raise ValidationError(_("Upload exceeds the declared size."))
+                    part.write(block)
+                    received += len(block)
+        finally:
+            # Tetap dicatat jika stream terputus, agar klien bisa melanjutkan dari sini
+            self.write({'received_size': received})
+        if received == self.size:
+            self._finalize()
+
+    def _finalize(self):
+        """
+        Memindahkan file yang sudah lengkap ke ir.attachment. Dengan penyimpanan filestore,
+        file sementara dipindahkan (rename) ke lokasi filestore tanpa dimuat ke memori.
+        """
+        self.ensure_one()
+        path = self._part_path()
+        Attachment = self.env['ir.attachment'].sudo()
+        vals = {
+            'name': self.filename or self.token,
+            'mimetype': self.mimetype or 'application/octet-stream',
+            'res_model': self._name,
+            'res_id': self.id,
+        }
+        if Attachment._storage() == 'file':
+            sha1 = hashlib.sha1()
+            with open(path, 'rb') as part:
+                for block in iter(lambda: part.read(UPLOAD_BLOCK_SIZE), b''):
+                    sha1.update(block)
+            checksum = sha1.hexdigest()
+            store_fname = f'{checksum[:2]}/{checksum}'
+            full_path = Attachment._full_path(store_fname)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if os.path.exists(full_path):
+                # Isi yang sama sudah ada di filestore (alamat berdasarkan checksum)
+                os.remove(path)
+            else:
+                os.replace(path, full_path)
+            vals.update(store_fname=store_fname, checksum=checksum, file_size=self.size)
+            attachment = Attachment.create(vals)
+        else:
+            with open(path, 'rb') as part:
+                attachment = Attachment.create(dict(vals, raw=part.read()))
+            os.remove(path)
+        self.write({'attachment_id': attachment.id, 'state': 'done'})
+
+    @api.model
+    def _consume_token(self, token):
+        """
+        Mengambil ir.attachment dari upload milik user saat ini yang sudah selesai,
+        lalu menandainya 'used' sehingga token tidak bisa dipakai dua kali.
+        Attachment dilepas dari sesi upload (tidak dihapus oleh _gc_uploads); pemanggil
+        menautkannya ke record tujuan (_link_attachment) atau menghapusnya setelah dipakai.
+        """
+        upload = self.sudo().search([
+            ('token', '=', token), ('user_id', '=', self.env.uid), ('state', '=', 'done'),
+        ], limit=1)
+        if not upload:
+            raise UserError(_("Upload token is invalid or the upload is not completed."))
+        attachment = upload.attachment_id
+        upload.write({'state': 'used', 'attachment_id': False})
+        return attachment
+
+    @api.model
+    def _link_attachment(self, attachment, record, field_name):
+        """
+        Menjadikan attachment upload sebagai nilai field Binary (attachment=True) milik
+        record, tanpa menyalin atau meng-encode ulang isi file.
+        """
+        record.env['ir.attachment'].sudo().search([
+            ('res_model', '=', record._name), ('res_id', '=', record.id), ('res_field', '=', field_name),
+        ]).unlink()
+        attachment.sudo().write({'res_model': record._name, 'res_id': record.id, 'res_field': field_name})
+        record.invalidate_recordset([field_name])
+
+    @api.model
+    def _gc_uploads(self):
+        """Menghapus sesi upload yang kedaluwarsa beserta file sementara dan lampirannya."""
+        expiry = fields.Datetime.now() - timedelta(hours=UPLOAD_EXPIRY_HOURS)
+        uploads = self.sudo().search([
+            '|', ('state', '=', 'used'), ('create_date', '<', expiry),
+        ])
+        for upload in uploads.filtered(lambda u: u.state == 'open'):
+            path = upload._part_path()
+            if os.path.exists(path):
+                os.remove(path)
+        uploads.attachment_id.unlink()
+        uploads.unlink()
+        _logger.info("_gc_uploads: %s upload session(s) removed", len(uploads))
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields
+from odoo import models, fields, api, Command
 
 class ResUsers(models.Model):
     _inherit = 'res.users'
@@ -8,4 +8,45 @@ class ResUsers(models.Model):
     # The inverse relation from mosque.mosque
     # This field is created automatically by the Many2many definition in the mosque.mosque model.
     # It doesn't need to be defined again, but it's good to be aware of its existence.
-    # mosque_ids = fields.Many2many('mosque.mosque', 'mosque_res_users_rel', 'user_id', 'mosque_id', string='Managed Mosques')
\ No newline at end of file
+    # mosque_ids = fields.Many2many('mosque.mosque', 'mosque_res_users_rel', 'user_id', 'mosque_id', string='Managed Mosques')
+
+    # Masjid yang diurus user ini (dibaca dari mosque.mosque.manager_user_ids).
+    # Dievaluasi oleh ir.rule admin masjid menjadi filter "id in (...)" yang di-cache per user.
+    managed_mosque_ids = fields.Many2many('mosque.mosque', string='Managed Mosques',
+                                          compute='_compute_managed_mosque_ids')
+
+    def _compute_managed_mosque_ids(self):
+        Mosque = self.env['mosque.mosque'].sudo()
+        mosque_ids_by_user = dict(Mosque._read_group(
+            [('manager_user_ids', 'in', self._origin.ids)], ['manager_user_ids'], ['id:array_agg'],
+        ))
+        for user in self:
+            user.managed_mosque_ids = Mosque.browse(mosque_ids_by_user.get(user._origin, []))
+
+    @api.model
+    def _masjida_provision_users(self, user_vals_list, group_xmlids=()):
+        """
+        Mencari atau membuat user untuk banyak login sekaligus (pengurus masjid / pendakwah).
+        Satu search untuk semua login, satu create untuk user baru, dan satu write per grup
+        untuk user yang belum memiliki grup tersebut. Mengembalikan dict login -> res.users.
+        """
+        Users = self.sudo()
+        logins = list({vals['login'] for vals in user_vals_list})
+        users_by_login = {user.login: user for user in Users.search([('login', 'in', logins)])}
+
+        new_vals_list = []
+        for vals in user_vals_list:
+            if vals['login'] not in users_by_login:
+                users_by_login[vals['login']] = None
+                new_vals_list.append(vals)
+        if new_vals_list:
+            for vals, user in zip(new_vals_list, Users.create(new_vals_list)):
+                users_by_login[vals['login']] = user
+
+        users = Users.browse([user.id for user in users_by_login.values()])
+        for xmlid in group_xmlids:
+            group = self.env.ref(xmlid).sudo()
+            missing = users.filtered_domain([('groups_id', 'not in', group.ids)])
+            if missing:
+                group.write({'users': [Command.link(user_id) for user_id in missing.ids]})
+        return users_by_login
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+from . import test_api_query_count
+from . import test_batch_throughput
+from . import test_rule_query_plan
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from datetime import timedelta
+
+
+class MasjidaTestCommon:
+    """Data dasar (area, masjid, pendakwah dengan user login) untuk test modul masjida."""
+
+    @classmethod
+    def _setup_masjida_data(cls):
+        cls.area = cls.env['area.area'].create({'name': 'Test Area'})
+        cls.mosque = cls.env['mosque.mosque'].create({
+            'code': 'TM001',
+            'name': 'Test Mosque',
+            'area_id': cls.area.id,
+        })
+        cls.preacher_user = cls.env['res.users'].create({
+            'name': 'Test Preacher',
+            'login': 'masjida_test_preacher',
+            'password': 'masjida_test_preacher',
+            'groups_id': [(6, 0, [cls.env.ref('base.group_portal').id])],
+        })
+        cls.preacher = cls.env['preacher.preacher'].create({
+            'name': 'Test Preacher',
+            'code': 'TP001',
+            'phone': '081234567890',
+            'area_id': cls.area.id,
+            'user_id': cls.preacher_user.id,
+        })
+        cls.start = fields.Datetime.now().replace(microsecond=0) + timedelta(days=1)
+
+    @classmethod
+    def _create_schedules(cls, count, offset=0, state='confirmed', **vals):
+        """Membuat 'count' jadwal berurutan (selisih satu hari agar tidak bentrok)."""
+        schedules = cls.env['sermon.schedule'].create([dict({
+            'mosque_id': cls.mosque.id,
+            'preacher_id': cls.preacher.id,
+            'topic': f'Topic {offset + index}',
+            'start_time': cls.start + timedelta(days=offset + index),
+        }, **vals) for index in range(count)])
+        if state != 'draft':
+            schedules.write({'state': state})
+        return schedules
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import HttpCase, tagged
+
+from .common import MasjidaTestCommon
+
+# Batas atas jumlah query per request (termasuk sesi & routing). Jumlah query juga
+# tidak boleh bertambah seiring jumlah jadwal/konten (lihat _assert_constant_queries).
+DETAIL_QUERY_LIMIT = 25
+
+
+@tagged('post_install', '-at_install')
+class TestApiQueryCount(MasjidaTestCommon, HttpCase):
+    """Regresi jumlah query endpoint detail: tetap, tidak N+1 terhadap relasi."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._setup_masjida_data()
+        cls._create_schedules(2)
+
+    def _count_queries(self, url):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        before = self.cr.sql_log_count
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200, response.text)
+        return self.cr.sql_log_count - before
+
+    def _assert_constant_queries(self, url):
+        """Jumlah query dengan 2 jadwal sama dengan jumlah query dengan 12 jadwal."""
+        # Request pertama menghangatkan cache registry (ormcache, routing)
+        self.url_open(url)
+        small = self._count_queries(url)
+        self._create_schedules(10, offset=2)
+        large = self._count_queries(url)
+        self.assertEqual(small, large, f"{url}: query count grows with the number of schedules")
+        with self.assertQueryCount(DETAIL_QUERY_LIMIT):
+            self.url_open(url)
+
+    def test_mosque_detail_query_count(self):
+        self._assert_constant_queries(f'/api/v1/mosques/{self.mosque.id}')
+
+    def test_preacher_detail_query_count(self):
+        self._assert_constant_queries(f'/api/v1/preachers/{self.preacher.id}?include=schedules,content')
+
+    def test_profile_query_count(self):
+        self.authenticate('masjida_test_preacher', 'masjida_test_preacher')
+        self._assert_constant_queries('/api/profile?include=schedules,content')
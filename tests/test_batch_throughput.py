@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import TransactionCase, tagged
+from datetime import timedelta
+import logging
+import time
+
+from .common import MasjidaTestCommon
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZES = (1, 10, 100)
+
+
+@tagged('post_install', '-at_install', '-standard', 'masjida_benchmark')
+class TestBatchThroughput(MasjidaTestCommon, TransactionCase):
+    """
+    Benchmark throughput transisi state per ukuran batch (bukan bagian test standar).
+    Jalankan dengan: --test-tags masjida_benchmark
+    Hasil (record/detik dan query per record) ditulis ke log.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._setup_masjida_data()
+        cls.board = cls.env['mosque.board'].create({
+            'name': 'Test Board',
+            'email': 'masjida_test_board@example.com',
+            'mosque_id': cls.mosque.id,
+        })
+        cls.board_env = cls.env(user=cls.board.user_id)
+
+    def _measure(self, label, size, action):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.cr.sql_log_count
+        started = time.perf_counter()
+        action()
+        self.env.flush_all()
+        elapsed = time.perf_counter() - started
+        queries = self.cr.sql_log_count - queries
+        _logger.info("%s batch=%s: %.1f records/s, %.1f queries/record",
+                     label, size, size / elapsed, queries / size)
+
+    def test_schedule_confirm_throughput(self):
+        offset = 0
+        for size in BATCH_SIZES:
+            schedules = self._create_schedules(size, offset=offset, state='sent')
+            offset += size
+            self._measure('sermon.schedule.action_confirm', size, schedules.action_confirm)
+            self.assertEqual(set(schedules.mapped('state')), {'confirmed'})
+
+    def test_proposal_approve_throughput(self):
+        offset = 0
+        for size in BATCH_SIZES:
+            proposals = self.env['sermon.proposal'].create([{
+                'preacher_id': self.preacher.id,
+                'mosque_id': self.mosque.id,
+                'proposed_topic': f'Proposal {offset + index}',
+                'proposed_start_time': self.start + timedelta(days=offset + index),
+                'state': 'submitted',
+            } for index in range(size)])
+            offset += size
+            self._measure('sermon.proposal.action_approve', size,
+                          proposals.with_env(self.board_env).action_approve)
+            self.assertEqual(set(proposals.mapped('state')), {'approved'})
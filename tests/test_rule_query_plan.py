@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import SQL
+import logging
+
+from .common import MasjidaTestCommon
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install')
+class TestRuleQueryPlan(MasjidaTestCommon, TransactionCase):
+    """
+    Membandingkan query list jadwal untuk admin masjid dengan domain ir.rule lama
+    (join lewat mosque.board) dan domain baru (mosque_id in managed_mosque_ids).
+    Rencana query (EXPLAIN) keduanya ditulis ke log.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._setup_masjida_data()
+        cls._create_schedules(5)
+        cls.board = cls.env['mosque.board'].create({
+            'name': 'Test Board',
+            'email': 'masjida_test_board@example.com',
+            'mosque_id': cls.mosque.id,
+        })
+        cls.admin_user = cls.board.user_id
+
+    def _explain(self, query):
+        self.env.flush_all()
+        self.env.cr.execute(SQL("EXPLAIN %s", query.select()))
+        return '\n'.join(row[0] for row in self.env.cr.fetchall())
+
+    def test_admin_schedule_rule_avoids_board_join(self):
+        Schedule = self.env['sermon.schedule']
+        # Sebelum: domain rule lama, dievaluasi tanpa rule lain (sudo)
+        old_query = Schedule.sudo()._search([('mosque_id.board_member_ids.user_id', '=', self.admin_user.id)])
+        # Sesudah: list view admin masjid, ir.rule diterapkan oleh ORM
+        new_query = Schedule.with_user(self.admin_user)._search([])
+
+        old_sql, new_sql = old_query.select().code, new_query.select().code
+        _logger.info("Mosque admin schedule list, old rule:\n%s\n%s", old_sql, self._explain(old_query))
+        _logger.info("Mosque admin schedule list, new rule:\n%s\n%s", new_sql, self._explain(new_query))
+
+        self.assertIn('mosque_board', old_sql)
+        self.assertNotIn('mosque_board', new_sql)
+        self.assertEqual(
+            Schedule.with_user(self.admin_user).search([]).ids,
+            Schedule.sudo().search([('mosque_id.board_member_ids.user_id', '=', self.admin_user.id)]).ids,
+        )
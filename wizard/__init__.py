@@ -1 +1,2 @@
-from . import preacher_password_wizard
\ No newline at end of file
+from . import preacher_password_wizard
+from . import import_wizard
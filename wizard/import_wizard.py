@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+import base64
+import io
+
+from ..models.importer import IMPORT_TARGETS
+
+
+class MasjidaImportWizard(models.TransientModel):
+    _name = 'masjida.import.wizard'
+    _description = 'Bulk Import Mosques, Preachers and Schedules'
+
+    target = fields.Selection([
+        ('mosques', 'Mosques'),
+        ('preachers', 'Preachers'),
+        ('board_members', 'Board Members'),
+        ('schedules', 'Schedules'),
+    ], string='Import', required=True, default='mosques')
+    file = fields.Binary(string='File (CSV/XLSX)', required=True)
+    filename = fields.Char(string='File Name')
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    created_count = fields.Integer(string='Created Records', readonly=True)
+    error_count = fields.Integer(string='Failed Rows', readonly=True)
+    error_log = fields.Text(string='Errors', readonly=True)
+
+    def action_import(self):
+        """Menjalankan import lalu menampilkan ringkasan hasil dan error per baris."""
+        self.ensure_one()
+        if self.target not in IMPORT_TARGETS:
+            raise UserError(_("Unknown import target."))
+        Importer = self.env['masjida.importer']
+        fileobj = io.BytesIO(base64.b64decode(self.file))
+        result = Importer._import_rows(self.target, Importer._read_rows(fileobj, self.filename))
+        self.write({
+            'state': 'done',
+            'created_count': result['created'],
+            'error_count': len(result['errors']),
+            'error_log': '\n'.join(f"Line {error['line']}: {error['message']}" for error in result['errors']),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }